@@ -0,0 +1,151 @@
+"""extract.py --bulk: 대량 문서를 프로세스 풀로 병렬 추출하여 JSONL로 기록합니다.
+
+입력 종류:
+- 디렉터리: 하위의 *.html, *.htm 파일 전체
+- glob 패턴: 'pages/**/*.html' 등
+- URL 목록 파일(.txt/.urls/.list): 한 줄에 URL 하나 (# 주석 허용)
+- JSONL(.jsonl 또는 '-' = 표준입력): 줄마다 {"id", "url"|"path"|"html"}
+
+결과는 끝난 순서대로 한 줄씩 바로 쓰므로 중간에 멈춰도 그때까지의 결과가 남습니다.
+"""
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from extract import extract_page, fetch_html
+
+HTML_EXTENSIONS = ('.html', '.htm')
+URL_LIST_EXTENSIONS = ('.txt', '.urls', '.list')
+STATS_INTERVAL = 2.0
+
+
+def detect_input_type(source):
+    if source == '-' or source.endswith('.jsonl'):
+        return 'jsonl'
+    if os.path.isdir(source):
+        return 'dir'
+    if source.endswith(URL_LIST_EXTENSIONS) and os.path.isfile(source):
+        return 'urls'
+    return 'glob'
+
+
+def iter_tasks(source, input_type='auto'):
+    """입력 소스를 {'id', 'path'|'url'|'html'} 작업으로 펼칩니다. 파일 내용은 워커가 읽습니다."""
+    if input_type == 'auto':
+        input_type = detect_input_type(source)
+
+    if input_type == 'dir':
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(HTML_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield {'id': path, 'path': path}
+    elif input_type == 'glob':
+        for path in sorted(glob.iglob(source, recursive=True)):
+            if os.path.isfile(path):
+                yield {'id': path, 'path': path}
+    elif input_type == 'urls':
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    yield {'id': url, 'url': url}
+    elif input_type == 'jsonl':
+        stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+        try:
+            for lineno, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                # 깨진 줄 하나 때문에 전체 실행이 멈추지 않도록 오류 작업으로 넘김
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {'id': f'line-{lineno}', 'error': f'JSONDecodeError: {e}'}
+                    continue
+                if not isinstance(item, dict):
+                    yield {'id': f'line-{lineno}', 'error': f'expected a JSON object, got {type(item).__name__}'}
+                    continue
+                item.setdefault('id', item.get('url') or item.get('path') or f'line-{lineno}')
+                yield item
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+    else:
+        raise ValueError(f'unknown input type: {input_type}')
+
+
+def extract_task(task):
+    """워커 프로세스에서 실행: 작업 하나를 추출해 결과 딕셔너리를 반환합니다."""
+    started = time.perf_counter()
+    result = {'id': task.get('id')}
+    if task.get('error'):
+        # 입력 단계에서 이미 잘못된 작업 (iter_tasks 참고)
+        result['error'] = task['error']
+        result['elapsed_ms'] = 0.0
+        return result
+    try:
+        url = task.get('url')
+        if task.get('html') is not None:
+            html = task['html']
+        elif task.get('path'):
+            with open(task['path'], 'r', encoding='utf-8', errors='replace') as f:
+                html = f.read()
+        elif url:
+            html = fetch_html(url)
+        else:
+            raise ValueError('task needs one of html, path, url')
+        page = extract_page(html, url=url)
+        result.update({
+            'title': page['title'],
+            'text': page['text'],
+            'char_count': len(page['text']),
+            'canonical_url': page['canonical_url'],
+            'html_bytes': len(html),
+        })
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _print_stats(done, errors, html_bytes, started, final=False):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    label = 'done' if final else 'progress'
+    print(
+        f'[bulk {label}] {done} docs, {errors} errors, {elapsed:.1f}s, '
+        f'{done / elapsed:.1f} docs/s, {html_bytes / elapsed / 1024 / 1024:.2f} MB/s',
+        file=sys.stderr,
+    )
+
+
+def run_bulk(source, output=None, workers=None, chunksize=8, input_type='auto'):
+    """source의 모든 문서를 병렬로 추출해 output(JSONL, 기본 표준출력)에 기록합니다.
+
+    반환값: {'done', 'errors', 'elapsed'}
+    """
+    workers = workers or os.cpu_count() or 1
+    out = sys.stdout if output in (None, '-') else open(output, 'w', encoding='utf-8')
+    started = time.perf_counter()
+    last_report = started
+    done = errors = html_bytes = 0
+    try:
+        with Pool(processes=workers) as pool:
+            for result in pool.imap_unordered(extract_task, iter_tasks(source, input_type), chunksize=chunksize):
+                out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                done += 1
+                errors += 'error' in result
+                html_bytes += result.get('html_bytes', 0)
+                now = time.perf_counter()
+                if now - last_report >= STATS_INTERVAL:
+                    out.flush()
+                    _print_stats(done, errors, html_bytes, started)
+                    last_report = now
+    finally:
+        out.flush()
+        if out is not sys.stdout:
+            out.close()
+    _print_stats(done, errors, html_bytes, started, final=True)
+    return {'done': done, 'errors': errors, 'elapsed': time.perf_counter() - started}
@@ -0,0 +1,5 @@
+"""여러 모듈이 함께 쓰는 설정값."""
+import os
+
+# 글 인덱스, 피드 DB, 자막 캐시, 프로파일을 저장하는 디렉터리
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
@@ -0,0 +1,292 @@
+"""추출된 본문에 대한 유사 문서 인덱스 (SimHash + SQLite).
+
+퍼가기/미러 글처럼 본문이 거의 같은 URL은 새로 요약하지 않고 기존 결과를 재사용합니다.
+
+- 본문을 정규화한 뒤 문자 3-gram 셰이글로 64비트 SimHash를 계산합니다.
+- 해시를 8비트씩 8개 밴드로 나눠 인덱싱합니다. 해밍 거리가 7 이하인 두 해시는
+  비둘기집 원리에 따라 최소 한 밴드가 같으므로, 밴드가 일치하는 후보만 비교하면 됩니다.
+- 유사도 = 1 - 해밍거리/64, DEDUP_THRESHOLD 이상이면 같은 글로 봅니다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from config import CACHE_DIR
+from urlcanon import canonicalize_url
+
+DEDUP_DB = os.environ.get('DEDUP_DB', os.path.join(CACHE_DIR, 'articles.db'))
+DEDUP_ENABLED = os.environ.get('DEDUP_ENABLED', '1') == '1'
+DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.9))
+# 너무 짧은 본문(에러 페이지 등)은 오탐이 많아 인덱싱하지 않음
+DEDUP_MIN_CHARS = int(os.environ.get('DEDUP_MIN_CHARS', 200))
+# 캐시된 결과의 유효 기간(초). 지나면 다시 가져와 요약 (0이면 만료 없음)
+DEDUP_TTL = float(os.environ.get('DEDUP_TTL', 30 * 24 * 3600))
+
+HASH_BITS = 64
+BANDS = 8
+BAND_BITS = HASH_BITS // BANDS
+SHINGLE_SIZE = 3
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+# *_version: 결과를 만든 프롬프트 템플릿 버전 (ETag 계산용)
+ROW_COLUMNS = ('id, url, title, text_length, summary, quiz, canonical_url, content_hash, '
+               'summary_version, quiz_version, quiz_bank_version')
+
+
+def normalize_text(text):
+    """공백/문장부호를 제거하고 소문자로 바꿔 표기 차이를 없앱니다."""
+    return _NON_WORD.sub('', (text or '').lower())
+
+
+def simhash(text):
+    """문자 n-gram 셰이글 기반 64비트 SimHash를 계산합니다."""
+    norm = normalize_text(text)
+    if len(norm) < SHINGLE_SIZE:
+        norm = norm.ljust(SHINGLE_SIZE)
+
+    counts = {}
+    for i in range(len(norm) - SHINGLE_SIZE + 1):
+        shingle = norm[i:i + SHINGLE_SIZE]
+        counts[shingle] = counts.get(shingle, 0) + 1
+
+    vector = [0] * HASH_BITS
+    for shingle, weight in counts.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(HASH_BITS):
+            if h >> bit & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    value = 0
+    for bit in range(HASH_BITS):
+        if vector[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def content_hash(text):
+    """정규화한 본문의 SHA-256 (HTTP ETag 등 결과 식별용)"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def fingerprint(text):
+    """본문의 SimHash와 content_hash. 추출 워커에서 본문과 함께 계산해 요청 스레드의 CPU 작업을 줄입니다."""
+    return {'simhash': simhash(text), 'content_hash': content_hash(text)}
+
+
+def _hashes(text, hashes):
+    """미리 계산한 값(hashes: 'simhash'/'content_hash' 키가 있는 dict)이 없으면 여기서 계산"""
+    hashes = hashes or {}
+    value = hashes.get('simhash')
+    text_hash = hashes.get('content_hash')
+    return (simhash(text) if value is None else value,
+            content_hash(text) if text_hash is None else text_hash)
+
+
+def similarity(a, b):
+    """두 SimHash 사이의 유사도 (0.0 ~ 1.0)"""
+    return 1.0 - bin(a ^ b).count('1') / HASH_BITS
+
+
+def _bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+
+def _to_signed(value):
+    # SQLite INTEGER는 부호 있는 64비트
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class ArticleIndex:
+    """본문 SimHash와 생성 결과(요약/퀴즈)를 함께 저장하는 온디스크 인덱스"""
+
+    def __init__(self, path=DEDUP_DB, threshold=DEDUP_THRESHOLD, min_chars=DEDUP_MIN_CHARS, ttl=DEDUP_TTL):
+        self.path = path
+        self.threshold = threshold
+        self.min_chars = min_chars
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            band_cols = ', '.join(f'b{i} INTEGER' for i in range(BANDS))
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT,
+                    title TEXT,
+                    text_length INTEGER,
+                    simhash INTEGER,
+                    {band_cols},
+                    summary TEXT,
+                    quiz TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                )""")
+            # 이전 버전 DB에 없는 컬럼 추가
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+            for column in ('canonical_url', 'content_hash', 'quiz_bank',
+                           'summary_version', 'quiz_version', 'quiz_bank_version'):
+                if column not in existing:
+                    conn.execute(f'ALTER TABLE articles ADD COLUMN {column} TEXT')
+            for i in range(BANDS):
+                conn.execute(f'CREATE INDEX IF NOT EXISTS idx_articles_b{i} ON articles (b{i})')
+            # 정규화된 URL(urlcanon.canonicalize_url) → 글 id
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS url_aliases (
+                    url TEXT PRIMARY KEY,
+                    article_id INTEGER
+                )''')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _cutoff(self):
+        """이 시각 이전에 갱신된 글은 만료로 봅니다."""
+        return time.time() - self.ttl if self.ttl > 0 else 0
+
+    def _row_to_dict(self, row, score=None):
+        article = {
+            'id': row[0],
+            'url': row[1],
+            'title': row[2],
+            'text_length': row[3],
+            'summary': row[4],
+            'quiz': json.loads(row[5]) if row[5] else None,
+            'canonical_url': row[6] or row[1],
+            'content_hash': row[7],
+            'summary_version': row[8],
+            'quiz_version': row[9],
+            'quiz_bank_version': row[10],
+        }
+        if score is not None:
+            article['similarity'] = score
+        return article
+
+    def find_by_url(self, url):
+        """정규화된 URL로 이미 처리한 글을 찾습니다. 없으면 None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT ' + ', '.join(f'a.{c}' for c in ROW_COLUMNS.split(', ')) + ' '
+                'FROM url_aliases u JOIN articles a ON a.id = u.article_id '
+                'WHERE u.url = ? AND a.updated_at >= ?',
+                (canonicalize_url(url), self._cutoff()),
+            ).fetchone()
+        return self._row_to_dict(row, 1.0) if row else None
+
+    def add_aliases(self, article_id, urls):
+        """글 id에 여러 URL 별칭(요청/최종/canonical URL)을 연결합니다.
+
+        이미 다른 글에 연결된 별칭은 덮어쓰지 않고, 그 글이 만료된 경우에만 새 글로 옮깁니다.
+        """
+        rows = [(canonicalize_url(u), article_id) for u in urls if u]
+        if not article_id or not rows:
+            return
+        cutoff = self._cutoff()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO url_aliases (url, article_id) VALUES (?, ?) '
+                'ON CONFLICT (url) DO UPDATE SET article_id = excluded.article_id '
+                'WHERE article_id NOT IN (SELECT id FROM articles WHERE updated_at >= ?)',
+                [(url, aid, cutoff) for url, aid in rows],
+            )
+
+    def indexable(self, text):
+        """add()로 저장할 수 있는 길이의 본문인지"""
+        return len(text or '') >= self.min_chars
+
+    def find(self, text, hashes=None):
+        """유사도가 임계값 이상인 가장 비슷한 글을 찾습니다. 없으면 None.
+
+        hashes: fingerprint(text) 결과 (load_article이 추출 워커에서 받아 둔 값). 없으면 여기서 계산.
+        """
+        if not self.indexable(text):
+            return None
+        value = hashes['simhash'] if hashes and hashes.get('simhash') is not None else simhash(text)
+        bands = _bands(value)
+        where = ' OR '.join(f'b{i} = ?' for i in range(BANDS))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT {ROW_COLUMNS}, simhash FROM articles WHERE ({where}) AND updated_at >= ?',
+                [*bands, self._cutoff()],
+            ).fetchall()
+
+        best, best_score = None, 0.0
+        for row in rows:
+            score = similarity(value, _to_unsigned(row[-1]))
+            if score >= self.threshold and score > best_score:
+                best, best_score = row, score
+        return self._row_to_dict(best, best_score) if best else None
+
+    def add(self, url, title, text, summary=None, quiz=None, canonical_url=None,
+            summary_version=None, quiz_version=None, hashes=None):
+        """새 글을 인덱스에 추가하고 id를 반환합니다. 짧은 본문은 None."""
+        if not self.indexable(text):
+            return None
+        value, text_hash = _hashes(text, hashes)
+        now = time.time()
+        band_cols = ', '.join(f'b{i}' for i in range(BANDS))
+        placeholders = ', '.join('?' for _ in range(BANDS + 12))
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                f'INSERT INTO articles (url, title, text_length, simhash, {band_cols}, '
+                f'summary, quiz, created_at, updated_at, canonical_url, content_hash, '
+                f'summary_version, quiz_version) VALUES ({placeholders})',
+                [url, title, len(text), _to_signed(value), *_bands(value),
+                 summary, json.dumps(quiz, ensure_ascii=False) if quiz is not None else None,
+                 now, now, canonical_url or canonicalize_url(url), text_hash,
+                 summary_version if summary is not None else None,
+                 quiz_version if quiz is not None else None],
+            )
+            return cur.lastrowid
+
+    def update(self, article_id, summary=None, quiz=None, summary_version=None, quiz_version=None):
+        """기존 글에 요약이나 퀴즈 결과(와 만든 프롬프트 버전)를 채웁니다."""
+        fields, values = [], []
+        if summary is not None:
+            fields.extend(['summary = ?', 'summary_version = ?'])
+            values.extend([summary, summary_version])
+        if quiz is not None:
+            fields.extend(['quiz = ?', 'quiz_version = ?'])
+            values.extend([json.dumps(quiz, ensure_ascii=False), quiz_version])
+        if not fields:
+            return
+        fields.append('updated_at = ?')
+        values.extend([time.time(), article_id])
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE articles SET {', '.join(fields)} WHERE id = ?", values)
+
+    def quiz_bank(self, article_id):
+        """글에 저장된 퀴즈 뱅크 (없으면 None). 크기가 커서 find 결과에는 포함하지 않습니다."""
+        with self._connect() as conn:
+            row = conn.execute('SELECT quiz_bank FROM articles WHERE id = ?', (article_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def save_quiz_bank(self, article_id, bank, version=None):
+        with self._lock, self._connect() as conn:
+            conn.execute('UPDATE articles SET quiz_bank = ?, quiz_bank_version = ?, updated_at = ? WHERE id = ?',
+                         (json.dumps(bank, ensure_ascii=False), version, time.time(), article_id))
+
+    def record(self, url, title, text, match=None, summary=None, quiz=None, aliases=(), canonical_url=None,
+               summary_version=None, quiz_version=None, hashes=None):
+        """find() 결과에 따라 기존 글을 갱신하거나 새로 추가하고 URL 별칭을 연결합니다."""
+        versions = {'summary_version': summary_version, 'quiz_version': quiz_version}
+        if match:
+            article_id = match['id']
+            self.update(article_id, summary=summary, quiz=quiz, **versions)
+        else:
+            article_id = self.add(url, title, text, summary=summary, quiz=quiz, canonical_url=canonical_url,
+                                  hashes=hashes, **versions)
+        self.add_aliases(article_id, [url, *aliases])
+        return article_id
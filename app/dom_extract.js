@@ -0,0 +1,113 @@
+// 브라우저 안에서 본문을 추출합니다 (Selenium execute_script로 실행, 함수 본문).
+// extract.py의 extract_page()와 같은 규칙을 따라 결과가 일치하도록 유지할 것:
+//   1) <link rel=canonical> 또는 og:url
+//   2) script/style/noscript/iframe/header/footer/nav/aside 제거
+//   3) title → 없으면 첫 h1
+//   4) article, main, id/class에 content|article|post|entry|main|body 가 있는 요소 중
+//      텍스트가 가장 긴 것 → 없으면 모든 <p> → 없으면 body
+// 반환값: {title, text, canonical_url}
+
+// 파이썬 str.strip()과 같은 공백 집합 (JS trim()은 \ufeff를 지우고 \x1c-\x1f, \x85는 남김)
+var PY_SPACE = '[\\t\\n\\v\\f\\r \\x1c-\\x1f\\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000]';
+var PY_STRIP = new RegExp('^' + PY_SPACE + '+|' + PY_SPACE + '+$', 'g');
+function pyStrip(s) {
+  return s.replace(PY_STRIP, '');
+}
+
+// BeautifulSoup get_text(separator, strip=True)와 같게: 문서 순서대로 텍스트 노드마다 strip, 빈 것 제외.
+// <template> 안의 문자열은 bs4가 TemplateString으로 두어 get_text()에서 빠지므로 여기서도 건너뜀.
+function collectText(node, parts) {
+  var children = node.childNodes;
+  for (var i = 0; i < children.length; i++) {
+    var child = children[i];
+    if (child.nodeType === 3) {
+      var t = pyStrip(child.nodeValue);
+      if (t) parts.push(t);
+    } else if (child.nodeType === 1 && child.nodeName !== 'TEMPLATE') {
+      collectText(child, parts);
+    }
+  }
+}
+
+function textOf(el, sep) {
+  var parts = [];
+  collectText(el, parts);
+  return parts.join(sep);
+}
+
+var canonical = null;
+var links = document.querySelectorAll('link[href]');
+for (var i = 0; i < links.length; i++) {
+  var rel = (links[i].getAttribute('rel') || '').toLowerCase().split(/\s+/);
+  if (rel.indexOf('canonical') !== -1) {
+    canonical = pyStrip(links[i].getAttribute('href'));
+    break;
+  }
+}
+if (!canonical) {
+  var og = document.querySelector('meta[property="og:url"]');
+  if (og && og.getAttribute('content')) {
+    canonical = pyStrip(og.getAttribute('content'));
+  }
+}
+if (canonical) {
+  try {
+    canonical = new URL(canonical, document.baseURI).href;
+  } catch (e) {}
+}
+
+var removed = document.querySelectorAll('script, style, noscript, iframe, header, footer, nav, aside');
+for (var i = 0; i < removed.length; i++) {
+  removed[i].remove();
+}
+
+// soup.title.string: 문서의 첫 <title>(SVG 안의 것 포함)의 자식이 문자열 하나일 때만 사용
+var title = '';
+var titleEl = document.getElementsByTagName('title')[0];
+if (titleEl && titleEl.childNodes.length === 1 && titleEl.firstChild.nodeType === 3) {
+  title = pyStrip(titleEl.firstChild.nodeValue);
+}
+if (!title) {
+  var h1 = document.querySelector('h1');
+  if (h1) title = textOf(h1, '');
+}
+
+var candidates = [];
+var article = document.querySelector('article');
+if (article) candidates.push(article);
+var main = document.querySelector('main');
+if (main) candidates.push(main);
+var pattern = /(content|article|post|entry|main|body)/i;
+var all = document.querySelectorAll('*');
+for (var i = 0; i < all.length; i++) {
+  var el = all[i];
+  var id = el.getAttribute('id');
+  var cls = el.getAttribute('class');
+  if (id !== null && pattern.test(id)) {
+    candidates.push(el);
+  } else if (cls !== null && pattern.test(cls.trim().split(/\s+/).join(' '))) {
+    candidates.push(el);
+  }
+}
+
+var best = '';
+for (var i = 0; i < candidates.length; i++) {
+  var text = textOf(candidates[i], '\n');
+  if (text.length > best.length) best = text;
+}
+
+if (!best) {
+  var paragraphs = document.querySelectorAll('p');
+  var texts = [];
+  for (var i = 0; i < paragraphs.length; i++) texts.push(textOf(paragraphs[i], ' '));
+  best = texts.join('\n\n');
+}
+if (!best && document.body) {
+  best = textOf(document.body, '\n');
+}
+
+return {
+  title: title,
+  text: pyStrip(best.replace(/\n{3,}/g, '\n\n')),
+  canonical_url: canonical
+};
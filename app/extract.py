@@ -1,19 +1,22 @@
-import requests
 from bs4 import BeautifulSoup
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+import contextlib
+import functools
+import os
+from types import SimpleNamespace
+from urllib.parse import urljoin
 import time
+from urlcanon import canonicalize_url
+import http_pool
 
 HEADERS = {
     'User-Agent': 'mcp-llm-crawler/1.0 (+https://example.com)'
 }
 
+# JS 사이트에서 page_source 대신 브라우저 안에서 본문 추출 (dom_extract.js)
+EXTRACT_IN_BROWSER = os.environ.get('EXTRACT_IN_BROWSER', '0') == '1'
+DOM_EXTRACT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dom_extract.js')
+
 # JavaScript 렌더링이 필요한 사이트 패턴
 JS_REQUIRED_DOMAINS = [
     'velog.io',
@@ -29,20 +32,53 @@ def needs_js_rendering(url):
     return any(domain in url for domain in JS_REQUIRED_DOMAINS)
 
 
-def fetch_html_with_selenium(url, timeout=15):
-    """Selenium을 사용하여 JavaScript 렌더링된 HTML 가져오기"""
-    options = Options()
+@functools.lru_cache(maxsize=None)
+def _selenium():
+    """Selenium/webdriver-manager를 처음 쓸 때 한 번만 불러옵니다.
+
+    정적 페이지만 처리하는 서버 시작, CLI, 테스트, 대량 추출 워커가
+    브라우저 스택 import 비용(수백 ms)을 내지 않도록 모듈 최상단에서 import 하지 않습니다.
+    크롬드라이버 경로도 여기서 한 번만 확인합니다.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.common.by import By
+    from webdriver_manager.chrome import ChromeDriverManager
+    return SimpleNamespace(
+        webdriver=webdriver,
+        Service=Service,
+        Options=Options,
+        WebDriverWait=WebDriverWait,
+        EC=EC,
+        By=By,
+        driver_path=ChromeDriverManager().install(),
+    )
+
+
+def create_driver(timeout=15):
+    """headless Chrome 드라이버를 만듭니다. 사용 후 driver.quit() 할 것."""
+    se = _selenium()
+    options = se.Options()
     options.add_argument('--headless')  # 브라우저 창 안 띄움
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-gpu')
     options.add_argument(f'user-agent={HEADERS["User-Agent"]}')
-    
+    driver = se.webdriver.Chrome(service=se.Service(se.driver_path), options=options)
+    driver.set_page_load_timeout(timeout)
+    return driver
+
+
+@contextlib.contextmanager
+def _rendered_page(url, timeout=15):
+    """headless Chrome으로 url을 열고 본문이 나타날 때까지 기다린 드라이버를 내줍니다."""
+    se = _selenium()
     driver = None
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.set_page_load_timeout(timeout)
+        driver = create_driver(timeout)
         
         driver.get(url)
         
@@ -51,41 +87,110 @@ def fetch_html_with_selenium(url, timeout=15):
         
         # article, main 또는 본문 요소가 나타날 때까지 대기
         try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "article"))
+            se.WebDriverWait(driver, 10).until(
+                se.EC.presence_of_element_located((se.By.TAG_NAME, "article"))
             )
         except:
             # article이 없어도 계속 진행
             pass
         
-        html = driver.page_source
-        return html
+        yield driver
     finally:
         if driver:
             driver.quit()
 
 
-def fetch_html(url, timeout=10):
-    """URL에서 HTML 가져오기 (필요시 Selenium 사용)"""
+def fetch_html_with_selenium(url, timeout=15):
+    """Selenium을 사용하여 JavaScript 렌더링된 HTML 가져오기"""
+    with _rendered_page(url, timeout) as driver:
+        return {'html': driver.page_source, 'url': url, 'final_url': driver.current_url}
+
+
+@functools.lru_cache(maxsize=None)
+def dom_extract_script():
+    with open(DOM_EXTRACT_SCRIPT, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def extract_in_browser(driver):
+    """열린 페이지에서 dom_extract.js를 실행해 {'title', 'text', 'canonical_url'}를 받습니다."""
+    doc = driver.execute_script(dom_extract_script())
+    return {'title': doc.get('title') or '', 'text': doc.get('text') or '',
+            'canonical_url': doc.get('canonical_url')}
+
+
+def fetch_dom_with_selenium(url, timeout=15):
+    """렌더링된 페이지에서 브라우저 안에서 바로 본문을 추출합니다.
+
+    page_source(수 MB HTML) 전송과 BeautifulSoup 재파싱을 건너뛰므로 html은 None이고,
+    추출 결과는 'doc'에 담깁니다.
+    """
+    with _rendered_page(url, timeout) as driver:
+        doc = extract_in_browser(driver)
+        return {'html': None, 'doc': doc, 'url': url, 'final_url': driver.current_url}
+
+
+def _fetch_with_requests(url, timeout):
+    # 호스트별 keep-alive 풀 사용 (동시 요청 수·간격 제한, 429/5xx 재시도 포함)
+    resp = http_pool.get(url, headers=HEADERS, timeout=timeout)
+    resp.raise_for_status()
+    resp.encoding = resp.apparent_encoding
+    # requests는 리다이렉트를 따라가므로 최종 URL을 함께 기록
+    return {'html': resp.text, 'url': url, 'final_url': resp.url}
+
+
+# 가져오기 백엔드: (url, timeout) -> {'html', 'url', 'final_url'}
+# selenium_dom은 html 대신 추출 결과 'doc'({'title', 'text', 'canonical_url'})을 반환
+FETCH_BACKENDS = {
+    'requests': _fetch_with_requests,
+    'selenium': fetch_html_with_selenium,
+    'selenium_dom': fetch_dom_with_selenium,
+}
+
+
+def select_backends(url, in_browser=None):
+    """URL에 맞는 백엔드 이름 목록 (앞에서부터 시도, 실패하면 다음으로 fallback)
+
+    in_browser가 참이면(기본값 EXTRACT_IN_BROWSER) JS 사이트는 브라우저 안에서 추출합니다.
+    """
+    if in_browser is None:
+        in_browser = EXTRACT_IN_BROWSER
     if needs_js_rendering(url):
+        return ['selenium_dom' if in_browser else 'selenium', 'requests']
+    return ['requests']
+
+
+def fetch_page(url, timeout=10, in_browser=None):
+    """URL에서 HTML을 가져와 {'html', 'url', 'final_url', 'canonical_url'} 형태로 반환합니다.
+
+    selenium_dom 백엔드를 쓰면 html은 None이고 브라우저에서 추출한 결과가 'doc'에 있습니다.
+
+    canonical_url은 리다이렉트 후 최종 URL을 정규화한 값이며, 본문 추출 후
+    <link rel=canonical>이 있으면 urlcanon.resolve_canonical()로 다시 결정합니다.
+    """
+    # robots.txt 확인은 백엔드와 무관하게 한 번 (금지면 Selenium으로도 가져오지 않음)
+    http_pool.check(url, headers=HEADERS)
+    backends = select_backends(url, in_browser)
+    if len(backends) > 1:
         print(f'JS rendering site detected: {url}')
+    page = None
+    for i, name in enumerate(backends):
+        print(f'Fetching with {name}: {url}')
         try:
-            # Selenium으로 시도
-            print(f'Trying Selenium for JS rendering...')
-            return fetch_html_with_selenium(url, timeout)
+            page = FETCH_BACKENDS[name](url, timeout)
+            page['backend'] = name
+            break
         except Exception as e:
-            # Selenium 실패 시 일반 requests로 fallback
-            print(f'Selenium failed ({e}), falling back to requests...')
-            resp = requests.get(url, headers=HEADERS, timeout=timeout)
-            resp.raise_for_status()
-            resp.encoding = resp.apparent_encoding
-            return resp.text
-    else:
-        print(f'Using requests for static HTML: {url}')
-        resp = requests.get(url, headers=HEADERS, timeout=timeout)
-        resp.raise_for_status()
-        resp.encoding = resp.apparent_encoding
-        return resp.text
+            if i == len(backends) - 1:
+                raise
+            print(f'{name} failed ({e}), falling back to {backends[i + 1]}...')
+    page['canonical_url'] = canonicalize_url(page['final_url'] or url)
+    return page
+
+
+def fetch_html(url, timeout=10):
+    """URL에서 HTML 가져오기 (필요시 Selenium 사용)"""
+    return fetch_page(url, timeout, in_browser=False)['html']
 
 
 def _clean_soup(soup):
@@ -93,6 +198,20 @@ def _clean_soup(soup):
         tag.decompose()
 
 
+def _find_canonical_link(soup):
+    """<link rel="canonical"> 또는 og:url 값을 찾습니다."""
+    for link in soup.find_all('link', href=True):
+        rel = link.get('rel') or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        if 'canonical' in [r.lower() for r in rel]:
+            return link['href'].strip()
+    og = soup.find('meta', attrs={'property': 'og:url'})
+    if og and og.get('content'):
+        return og['content'].strip()
+    return None
+
+
 def extract_text(html, url=None):
     """주요 본문과 타이틀을 추출하여 (title, text) 형태로 반환합니다.
 
@@ -101,7 +220,20 @@ def extract_text(html, url=None):
     2) id/class에 'content','article','post','entry','main' 포함하는 요소 검색
     3) 위가 없으면 모든 <p>를 모아 가장 긴 연속 블록 사용
     """
+    page = extract_page(html, url=url)
+    return page['title'], page['text']
+
+
+def extract_page(html, url=None):
+    """extract_text()와 같지만 {'title', 'text', 'canonical_url'} 딕셔너리를 반환합니다.
+
+    canonical_url은 페이지가 선언한 <link rel=canonical>(없으면 og:url)을
+    url 기준 절대 경로로 바꾼 값이며, 없으면 None입니다.
+    """
     soup = BeautifulSoup(html, 'html.parser')
+    canonical = _find_canonical_link(soup)
+    if canonical and url:
+        canonical = urljoin(url, canonical)
     _clean_soup(soup)
 
     # title
@@ -156,7 +288,7 @@ def extract_text(html, url=None):
 
     # normalize whitespace
     text = re.sub(r'\n{3,}', '\n\n', best).strip()
-    return title or '', text
+    return {'title': title or '', 'text': text, 'canonical_url': canonical}
 
 
 if __name__ == '__main__':
@@ -188,9 +320,46 @@ if __name__ == '__main__':
         action='store_true',
         help='결과를 JSON 형식으로 출력'
     )
+    parser.add_argument(
+        '--bulk', '-b',
+        action='store_true',
+        help='대량 모드: 입력을 디렉터리, glob 패턴, URL 목록 파일 또는 JSONL(-: 표준입력)로 해석하여 병렬 추출'
+    )
+    parser.add_argument(
+        '--input-type',
+        choices=['auto', 'dir', 'glob', 'urls', 'jsonl'],
+        default='auto',
+        help='대량 모드 입력 종류 (기본값: 자동 감지)'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help='대량 모드 워커 프로세스 수 (기본값: CPU 수)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        default=None,
+        help='대량 모드 JSONL 출력 파일 (기본값: 표준출력)'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=8,
+        help='대량 모드에서 워커에 한 번에 넘길 문서 수'
+    )
     
     args = parser.parse_args()
     
+    if args.bulk:
+        if not args.input:
+            print('Error: --bulk 옵션 사용 시 입력을 지정해야 합니다.', file=sys.stderr)
+            sys.exit(1)
+        from bulk import run_bulk
+        stats = run_bulk(args.input, output=args.output, workers=args.workers,
+                         chunksize=args.chunksize, input_type=args.input_type)
+        sys.exit(1 if stats['done'] and stats['errors'] == stats['done'] else 0)
+    
     try:
         # 입력 소스 결정
         if args.file:
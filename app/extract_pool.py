@@ -0,0 +1,201 @@
+"""본문 추출(extract_page)을 요청 스레드 밖의 워커 프로세스에서 실행합니다.
+
+BeautifulSoup 파싱은 순수 파이썬 CPU 작업이라 GIL을 잡고 있어, 큰 페이지 몇 개만으로도
+같은 프로세스의 다른 요청(/health 포함)이 멈춥니다. 워커 프로세스로 넘기면 요청 스레드는
+결과를 기다리는 동안 GIL을 놓습니다.
+
+- 워커는 fork가 아니라 새 인터프리터(python extract_pool.py)로 띄웁니다. 이미 업로더·피드
+  스케줄러 스레드가 도는 서버 프로세스를 fork하면 잠긴 락을 물려받아 멈출 수 있고,
+  multiprocessing의 spawn/forkserver는 main.py를 다시 import 해 그 스레드들을 워커마다 띄우기 때문입니다.
+- 서버 시작 시 워커를 미리 띄우고 bs4/extract import와 첫 파싱을 끝내 둡니다 (warm).
+- 대기+실행 중 작업이 EXTRACT_POOL_QUEUE를 넘으면 바로 ExtractQueueFull (서버는 503).
+- 제한 시간(EXTRACT_TIMEOUT)은 워커가 작업을 받은 시점부터 재며, 넘기면 그 워커 하나만
+  종료하고 새 워커로 바꿉니다 (ExtractTimeout). 다른 워커의 작업은 영향을 받지 않습니다.
+- 유사 문서 검색용 SimHash/content_hash(dedup.fingerprint)도 워커에서 함께 계산해 돌려줍니다.
+- 넘기기 전에 <script>/<style>/<noscript> 블록을 지우고(어차피 _clean_soup이 버림)
+  EXTRACT_MAX_HTML_BYTES 까지만 UTF-8 bytes로 한 번 인코딩해 보냅니다.
+"""
+import os
+import pickle
+import queue
+import re
+import select
+import subprocess
+import sys
+import threading
+
+from dedup import fingerprint
+from extract import extract_page
+
+EXTRACT_POOL_WORKERS = int(os.environ.get('EXTRACT_POOL_WORKERS', 2))
+EXTRACT_POOL_QUEUE = int(os.environ.get('EXTRACT_POOL_QUEUE', 8))
+EXTRACT_TIMEOUT = float(os.environ.get('EXTRACT_TIMEOUT', 20))
+EXTRACT_MAX_HTML_BYTES = int(os.environ.get('EXTRACT_MAX_HTML_BYTES', 5 * 1024 * 1024))
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+_STRIP_BLOCKS = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+WARM_HTML = b'<html><head><title>warm</title></head><body><article><p>warm</p></article></body></html>'
+
+
+class ExtractQueueFull(RuntimeError):
+    """추출 대기열이 가득 참"""
+
+
+class ExtractTimeout(TimeoutError):
+    """본문 추출이 제한 시간을 넘김"""
+
+
+class ExtractWorkerError(RuntimeError):
+    """워커 프로세스가 죽었거나 추출 중 예외가 남"""
+
+
+def prepare_html(html, max_bytes=EXTRACT_MAX_HTML_BYTES):
+    """워커로 보낼 HTML을 줄이고 UTF-8 bytes로 직렬화합니다."""
+    data = _STRIP_BLOCKS.sub('', html).encode('utf-8', errors='replace')
+    if len(data) > max_bytes:
+        print(f'HTML too large ({len(data)} bytes), truncating to {max_bytes}')
+        data = data[:max_bytes]
+    return data
+
+
+def _extract_worker(data, url):
+    # 잘린 멀티바이트 문자는 버림
+    doc = extract_page(data.decode('utf-8', errors='ignore'), url=url)
+    doc.update(fingerprint(doc['text']))
+    return doc
+
+
+def _serve():
+    """워커 프로세스 본체: 표준입력으로 (data, url)을 받아 표준출력으로 결과를 돌려줍니다."""
+    # 결과 전송용 파이프를 따로 잡고, print 출력은 stderr로 보내 프로토콜을 깨지 않게 함
+    out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+    while True:
+        try:
+            data, url = pickle.load(inp)
+        except EOFError:
+            return
+        try:
+            result = ('ok', _extract_worker(data, url))
+        except Exception as e:
+            result = ('error', f'{type(e).__name__}: {e}')
+        pickle.dump(result, out, protocol=pickle.HIGHEST_PROTOCOL)
+        out.flush()
+
+
+class _Worker:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cwd=os.path.dirname(WORKER_SCRIPT),
+        )
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def call(self, data, url, timeout):
+        """작업 하나를 보내고 결과를 기다립니다. timeout은 워커에 보낸 뒤부터 잽니다."""
+        try:
+            pickle.dump((data, url), self.proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            self.proc.stdin.flush()
+            ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+            if not ready:
+                raise ExtractTimeout(f'extraction took longer than {timeout:g}s')
+            status, value = pickle.load(self.proc.stdout)
+        except (EOFError, BrokenPipeError, pickle.UnpicklingError) as e:
+            raise ExtractWorkerError(f'extract worker {self.pid} died: {type(e).__name__}') from e
+        if status == 'error':
+            raise ExtractWorkerError(value)
+        return value
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class ExtractPool:
+    """extract_page()를 실행하는 워커 프로세스 풀. workers=0이면 현재 프로세스에서 바로 실행합니다."""
+
+    def __init__(self, workers=EXTRACT_POOL_WORKERS, queue_size=EXTRACT_POOL_QUEUE,
+                 timeout=EXTRACT_TIMEOUT, max_html_bytes=EXTRACT_MAX_HTML_BYTES):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_html_bytes = max_html_bytes
+        self.stats = {'tasks': 0, 'rejected': 0, 'timeouts': 0, 'restarts': 0}
+        self._slots = threading.BoundedSemaphore(max(queue_size, 1))
+        self._lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._started = False
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self):
+        """워커를 모두 띄우고 extract 모듈 import와 첫 파싱을 끝내 둡니다. (서버 시작 시 호출)"""
+        with self._lock:
+            if self._started or self.workers <= 0:
+                return
+            self._started = True
+        workers = [_Worker() for _ in range(self.workers)]
+        for worker in workers:
+            worker.call(WARM_HTML, None, timeout=60)
+            self._idle.put(worker)
+        print(f'Extract pool ready: {len(workers)} workers')
+
+    def worker_pids(self):
+        return [w.pid for w in list(self._idle.queue)]
+
+    def _replace(self, worker):
+        """멈췄거나 죽은 워커 하나만 종료하고 새 워커를 만듭니다."""
+        worker.kill()
+        self._count('restarts')
+        return _Worker()
+
+    def extract(self, html, url=None):
+        """extract_page()의 {'title', 'text', 'canonical_url'}에 'simhash', 'content_hash'를 더해 반환합니다."""
+        data = prepare_html(html, self.max_html_bytes)
+        if self.workers <= 0:
+            return _extract_worker(data, url)
+        self.start()
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ExtractQueueFull('extraction queue is full, try again later')
+        try:
+            self._count('tasks')
+            # 빈 워커를 기다리는 시간은 제한 시간에 넣지 않음
+            worker = self._idle.get()
+            try:
+                return worker.call(data, url, self.timeout)
+            except ExtractTimeout:
+                self._count('timeouts')
+                worker = self._replace(worker)
+                raise
+            except ExtractWorkerError:
+                if worker.proc.poll() is not None:
+                    worker = self._replace(worker)
+                raise
+            finally:
+                self._idle.put(worker)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            self._started = False
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+if __name__ == '__main__':
+    _serve()
@@ -0,0 +1,314 @@
+"""RSS/Atom 피드와 사이트맵 구독, 새 글 사전 요약.
+
+- 구독한 피드를 FEED_POLL_INTERVAL 마다 조건부 GET(ETag/Last-Modified)으로 확인하고
+  304면 본문을 받지 않습니다.
+- 이미 본 글(정규화된 URL)은 건너뛰고 새 글만 'pending'으로 쌓습니다.
+- 사용량이 적은 시간대(FEED_OFFPEAK_HOURS)에 서버가 한가할 때만 pending 글을
+  FEED_BATCH_SIZE 개씩 요약하여, 사용자가 요청할 때는 캐시에서 바로 응답되도록 합니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from datetime import datetime
+
+import http_pool
+from config import CACHE_DIR
+from extract import HEADERS
+from urlcanon import canonicalize_url
+
+FEEDS_DB = os.environ.get('FEEDS_DB', os.path.join(CACHE_DIR, 'feeds.db'))
+FEED_SCHEDULER_ENABLED = os.environ.get('FEED_SCHEDULER_ENABLED', '1') == '1'
+FEED_POLL_INTERVAL = int(os.environ.get('FEED_POLL_INTERVAL', 1800))
+FEED_BATCH_SIZE = int(os.environ.get('FEED_BATCH_SIZE', 5))
+# 사전 요약을 돌릴 시간대 (로컬 시각, 'start-end', 끝 시각 미포함, 항상 돌리려면 '0-24')
+FEED_OFFPEAK_HOURS = os.environ.get('FEED_OFFPEAK_HOURS', '1-7')
+# 처음 구독할 때 사전 요약할 최신 글 수 (나머지는 본 것으로 처리)
+FEED_INITIAL_ENTRIES = int(os.environ.get('FEED_INITIAL_ENTRIES', 10))
+MAX_ATTEMPTS = 3
+
+
+def _local(tag):
+    """'{namespace}link' → 'link'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_date(value):
+    if not value:
+        return 0.0
+    value = value.strip()
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def parse_feed(content):
+    """RSS 2.0, Atom, 사이트맵 XML에서 글 목록을 뽑습니다.
+
+    반환값: (kind, [{'url', 'title', 'published'}]) — 최신 글이 앞에 오도록 정렬
+    """
+    root = ET.fromstring(content)
+    kind = _local(root.tag)
+    entries = []
+    if kind == 'rss' or kind == 'RDF':
+        for item in root.iter():
+            if _local(item.tag) != 'item':
+                continue
+            fields = {_local(child.tag): (child.text or '').strip() for child in item}
+            url = fields.get('link') or fields.get('guid')
+            if url:
+                entries.append({'url': url, 'title': fields.get('title', ''),
+                                'published': _parse_date(fields.get('pubDate') or fields.get('date'))})
+        kind = 'rss'
+    elif kind == 'feed':
+        for entry in root:
+            if _local(entry.tag) != 'entry':
+                continue
+            url, title, published = None, '', 0.0
+            for child in entry:
+                name = _local(child.tag)
+                if name == 'link' and child.get('rel', 'alternate') == 'alternate' and not url:
+                    url = child.get('href')
+                elif name == 'title':
+                    title = (child.text or '').strip()
+                elif name in ('published', 'updated') and not published:
+                    published = _parse_date(child.text)
+            if url:
+                entries.append({'url': url, 'title': title, 'published': published})
+        kind = 'atom'
+    elif kind in ('urlset', 'sitemapindex'):
+        # sitemapindex는 하위 사이트맵 목록이므로 글로 취급하지 않음
+        if kind == 'urlset':
+            for node in root:
+                fields = {_local(child.tag): (child.text or '').strip() for child in node}
+                if fields.get('loc'):
+                    entries.append({'url': fields['loc'], 'title': '',
+                                    'published': _parse_date(fields.get('lastmod'))})
+        kind = 'sitemap'
+    else:
+        raise ValueError(f'unsupported feed format: {kind}')
+
+    entries.sort(key=lambda e: e['published'], reverse=True)
+    return kind, entries
+
+
+def in_offpeak(now=None, hours=FEED_OFFPEAK_HOURS):
+    hour = (now or datetime.now()).hour
+    start, end = (int(x) for x in hours.split('-'))
+    if start <= end:
+        return start <= hour < end
+    # '22-6' 처럼 자정을 넘는 구간
+    return hour >= start or hour < end
+
+
+class FeedStore:
+    """구독 목록과 글 상태를 SQLite에 저장"""
+
+    def __init__(self, path=FEEDS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    kind TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_checked REAL,
+                    last_status INTEGER,
+                    created_at REAL
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    feed_url TEXT,
+                    title TEXT,
+                    published REAL,
+                    status TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    seen_at REAL,
+                    processed_at REAL
+                )""")
+            # url은 중복 판정용 정규화 URL, link는 실제로 가져올 피드 원문 링크
+            existing = {row[1] for row in conn.execute('PRAGMA table_info(entries)')}
+            if 'link' not in existing:
+                conn.execute('ALTER TABLE entries ADD COLUMN link TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_status ON entries (status, published)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def subscribe(self, url):
+        with self._lock, self._connect() as conn:
+            conn.execute('INSERT OR IGNORE INTO feeds (url, created_at) VALUES (?, ?)', (url, time.time()))
+
+    def unsubscribe(self, url):
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM feeds WHERE url = ?', (url,))
+            conn.execute("DELETE FROM entries WHERE feed_url = ? AND status = 'pending'", (url,))
+
+    def feeds(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT f.url, f.kind, f.etag, f.last_modified, f.last_checked, f.last_status, '
+                "(SELECT COUNT(*) FROM entries e WHERE e.feed_url = f.url AND e.status = 'pending') "
+                'FROM feeds f ORDER BY f.created_at'
+            ).fetchall()
+        return [{'url': r[0], 'kind': r[1], 'etag': r[2], 'last_modified': r[3],
+                 'last_checked': r[4], 'last_status': r[5], 'pending': r[6]} for r in rows]
+
+    def mark_checked(self, url, status, kind=None, etag=None, last_modified=None):
+        with self._lock, self._connect() as conn:
+            if status == 200:
+                conn.execute(
+                    'UPDATE feeds SET kind = ?, etag = ?, last_modified = ?, last_checked = ?, last_status = ? '
+                    'WHERE url = ?', (kind, etag, last_modified, time.time(), status, url))
+            else:
+                conn.execute('UPDATE feeds SET last_checked = ?, last_status = ? WHERE url = ?',
+                             (time.time(), status, url))
+
+    def add_entries(self, feed_url, entries, first_poll=False):
+        """처음 보는 글만 추가하고 추가된 수를 반환합니다."""
+        now = time.time()
+        added = 0
+        with self._lock, self._connect() as conn:
+            for i, entry in enumerate(entries):
+                status = 'pending'
+                if first_poll and i >= FEED_INITIAL_ENTRIES:
+                    status = 'skipped'
+                cur = conn.execute(
+                    'INSERT OR IGNORE INTO entries (url, link, feed_url, title, published, status, seen_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (canonicalize_url(entry['url']), entry['url'], feed_url, entry['title'],
+                     entry['published'], status, now),
+                )
+                added += cur.rowcount
+        return added
+
+    def pending(self, limit):
+        """요약할 글의 원문 링크 목록 (정규화 URL은 https 강제 등으로 실제 주소와 다를 수 있음)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT COALESCE(link, url) FROM entries WHERE status = 'pending' "
+                'ORDER BY published DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def mark_entry(self, url, ok, error=None):
+        url = canonicalize_url(url)
+        with self._lock, self._connect() as conn:
+            if ok:
+                conn.execute("UPDATE entries SET status = 'done', processed_at = ?, error = NULL WHERE url = ?",
+                             (time.time(), url))
+            else:
+                conn.execute(
+                    'UPDATE entries SET attempts = attempts + 1, error = ?, '
+                    "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE url = ?",
+                    (error, MAX_ATTEMPTS, url))
+
+
+def poll_feed(store, feed, session=None, timeout=10):
+    """피드 하나를 조건부 GET으로 확인하고 새 글 수를 반환합니다."""
+    session = session or http_pool
+    headers = dict(HEADERS)
+    if feed.get('etag'):
+        headers['If-None-Match'] = feed['etag']
+    if feed.get('last_modified'):
+        headers['If-Modified-Since'] = feed['last_modified']
+    resp = session.get(feed['url'], headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        store.mark_checked(feed['url'], 304)
+        return 0
+    resp.raise_for_status()
+    kind, entries = parse_feed(resp.content)
+    first_poll = feed.get('kind') is None
+    added = store.add_entries(feed['url'], entries, first_poll=first_poll)
+    store.mark_checked(feed['url'], 200, kind=kind,
+                       etag=resp.headers.get('ETag'), last_modified=resp.headers.get('Last-Modified'))
+    print(f"Feed {feed['url']}: {len(entries)} entries, {added} new")
+    return added
+
+
+class FeedScheduler:
+    """피드 확인과 사전 요약을 주기적으로 돌리는 백그라운드 스레드
+
+    process_entry(url): 글 하나를 요약해 캐시에 저장하는 함수 (실패하면 예외를 던질 것, 최대 MAX_ATTEMPTS 번 재시도)
+    is_busy(): True면 사용자 요청이 처리 중이므로 사전 요약을 미룸
+    """
+
+    def __init__(self, store, process_entry, is_busy=lambda: False,
+                 poll_interval=FEED_POLL_INTERVAL, batch_size=FEED_BATCH_SIZE, offpeak_hours=FEED_OFFPEAK_HOURS):
+        self.store = store
+        self.process_entry = process_entry
+        self.is_busy = is_busy
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.offpeak_hours = offpeak_hours
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='feed-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        """다음 주기를 기다리지 않고 바로 확인"""
+        self._wake.set()
+
+    def poll_all(self):
+        added = 0
+        for feed in self.store.feeds():
+            try:
+                added += poll_feed(self.store, feed)
+            except Exception as e:
+                print(f"Feed poll failed for {feed['url']}: {e}")
+                self.store.mark_checked(feed['url'], 0)
+        return added
+
+    def run_batch(self, force=False):
+        """pending 글을 batch_size 개까지 요약합니다. 한가하지 않으면 중단."""
+        done = 0
+        if not force and not in_offpeak(hours=self.offpeak_hours):
+            return done
+        for url in self.store.pending(self.batch_size):
+            if not force and self.is_busy():
+                print('Server busy, deferring feed prefetch')
+                break
+            try:
+                self.process_entry(url)
+                self.store.mark_entry(url, ok=True)
+                done += 1
+            except Exception as e:
+                print(f'Prefetch failed for {url}: {e}')
+                self.store.mark_entry(url, ok=False, error=str(e))
+        return done
+
+    def _run(self):
+        next_poll = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_poll:
+                self.poll_all()
+                next_poll = time.monotonic() + self.poll_interval
+            # 배치가 꽉 찼으면 남은 글이 있을 수 있으므로 곧바로 다음 배치
+            done = self.run_batch()
+            wait = 5 if done >= self.batch_size else min(60, self.poll_interval)
+            self._wake.wait(wait)
+            if self._wake.is_set():
+                self._wake.clear()
+                next_poll = 0.0
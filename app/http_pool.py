@@ -0,0 +1,216 @@
+"""호스트별 keep-alive 연결 풀과 예의 바른(polite) 가져오기 스케줄러.
+
+- 호스트마다 requests.Session을 하나씩 두어 DNS/TCP/TLS 연결을 재사용합니다.
+- 호스트별 동시 요청 수(FETCH_HOST_CONCURRENCY)와 최소 요청 간격
+  (FETCH_HOST_MIN_INTERVAL, robots.txt의 Crawl-delay가 더 크면 그 값)을 지킵니다.
+- robots.txt는 호스트별로 FETCH_ROBOTS_TTL 동안 캐시합니다.
+- 429/5xx는 Retry-After를 존중하며(최대 FETCH_MAX_RETRY_AFTER초) 지수 백오프로 재시도합니다.
+- 호스트별 세션은 최근에 쓴 FETCH_MAX_HOSTS 개까지만 두고 오래된 것부터 닫습니다.
+- stats()로 호스트별 요청 수, 새 연결 수, 연결 재사용률을 확인할 수 있습니다.
+
+requests(urllib3)는 HTTP/1.1만 지원하므로 HTTP/2 대신 keep-alive 재사용으로 연결 비용을 줄입니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+FETCH_HOST_CONCURRENCY = int(os.environ.get('FETCH_HOST_CONCURRENCY', 2))
+FETCH_HOST_MIN_INTERVAL = float(os.environ.get('FETCH_HOST_MIN_INTERVAL', 0.5))
+FETCH_RESPECT_ROBOTS = os.environ.get('FETCH_RESPECT_ROBOTS', '1') == '1'
+FETCH_ROBOTS_TTL = int(os.environ.get('FETCH_ROBOTS_TTL', 24 * 3600))
+FETCH_RETRIES = int(os.environ.get('FETCH_RETRIES', 3))
+# 서버가 Retry-After: 3600 같은 값을 보내도 사용자 요청이 그만큼 멈추지 않도록 상한을 둠
+FETCH_MAX_RETRY_AFTER = float(os.environ.get('FETCH_MAX_RETRY_AFTER', 10))
+FETCH_MAX_HOSTS = int(os.environ.get('FETCH_MAX_HOSTS', 256))
+# Crawl-delay가 너무 크면 사용자 요청이 멈추므로 상한을 둠
+MAX_CRAWL_DELAY = 10.0
+ROBOTS_AGENT = 'mcp-llm-crawler'
+
+
+class RobotsDisallowed(PermissionError):
+    """robots.txt가 해당 URL 수집을 금지함"""
+
+
+class _CappedRetry(Retry):
+    """Retry-After 대기 시간을 max_retry_after초로 자르는 Retry
+
+    Retry.new()가 생성자 인자만 넘기므로 상한은 클래스 속성으로 둡니다.
+    """
+
+    max_retry_after = FETCH_MAX_RETRY_AFTER
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+def _retry_policy():
+    return _CappedRetry(
+        total=FETCH_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+class _Host:
+    def __init__(self, origin, concurrency):
+        self.origin = origin
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=_retry_policy())
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.adapter = adapter
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.next_allowed = 0.0
+        self.robots_lock = threading.Lock()
+        self.robots = None
+        self.robots_expires = 0.0
+
+    def connection_stats(self):
+        """urllib3 풀이 만든 연결 수와 보낸 요청 수"""
+        connections = requests_sent = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return connections, requests_sent
+
+
+class HostPool:
+    def __init__(self, concurrency=FETCH_HOST_CONCURRENCY, min_interval=FETCH_HOST_MIN_INTERVAL,
+                 respect_robots=FETCH_RESPECT_ROBOTS, robots_ttl=FETCH_ROBOTS_TTL, max_hosts=FETCH_MAX_HOSTS):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.respect_robots = respect_robots
+        self.robots_ttl = robots_ttl
+        self.max_hosts = max_hosts
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'.lower()
+        evicted = []
+        with self._lock:
+            host = self._hosts.get(origin)
+            if host is None:
+                host = self._hosts[origin] = _Host(origin, self.concurrency)
+                while len(self._hosts) > max(self.max_hosts, 1):
+                    evicted.append(self._hosts.popitem(last=False)[1])
+            else:
+                self._hosts.move_to_end(origin)
+        for old in evicted:
+            # 사용 중인 연결은 요청이 끝나 반환될 때 닫힘
+            old.session.close()
+        return host
+
+    def _robots(self, host, headers):
+        # 같은 호스트에 동시에 여러 요청이 와도 robots.txt는 한 번만 받음
+        with host.robots_lock:
+            now = time.time()
+            if host.robots is not None and now < host.robots_expires:
+                return host.robots
+            host.robots = self._fetch_robots(host, headers)
+            host.robots_expires = now + self.robots_ttl
+            return host.robots
+
+    def _fetch_robots(self, host, headers):
+        parser = RobotFileParser()
+        try:
+            resp = host.session.get(f'{host.origin}/robots.txt', headers=headers, timeout=5)
+            if resp.status_code in (401, 403):
+                parser.disallow_all = True
+            elif resp.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(resp.text.splitlines())
+        except requests.RequestException:
+            # robots.txt를 못 받으면 허용으로 간주
+            parser.allow_all = True
+        return parser
+
+    def _wait_turn(self, host, delay):
+        """호스트별 최소 간격을 지키도록 자기 차례 시각을 예약하고 기다립니다."""
+        with host.lock:
+            now = time.monotonic()
+            start = max(now, host.next_allowed)
+            host.next_allowed = start + delay
+        if start > now:
+            time.sleep(start - now)
+
+    def check(self, url, headers=None):
+        """robots.txt가 url을 금지하면 RobotsDisallowed, 허용하면 호스트 요청 간격(초)을 반환합니다."""
+        host = self._host(url)
+        delay = self.min_interval
+        if not self.respect_robots:
+            return delay
+        robots = self._robots(host, headers)
+        if not robots.can_fetch(ROBOTS_AGENT, url):
+            raise RobotsDisallowed(f'robots.txt disallows {url}')
+        crawl_delay = robots.crawl_delay(ROBOTS_AGENT)
+        if crawl_delay:
+            delay = max(delay, min(float(crawl_delay), MAX_CRAWL_DELAY))
+        return delay
+
+    def get(self, url, headers=None, timeout=10, respect_robots=True):
+        """예의 규칙을 지키며 GET 요청을 보냅니다.
+
+        respect_robots=False는 yt-dlp가 알려준 자막 URL처럼 사람이 아닌 API 주소에 씁니다.
+        """
+        host = self._host(url)
+        delay = self.check(url, headers) if respect_robots else self.min_interval
+        with host.semaphore:
+            self._wait_turn(host, delay)
+            return host.session.get(url, headers=headers, timeout=timeout)
+
+    def stats(self):
+        """호스트별 {'requests', 'connections', 'reuse_ratio'} 와 전체 합계"""
+        per_host = {}
+        total_conn = total_req = 0
+        with self._lock:
+            hosts = list(self._hosts.values())
+        for host in hosts:
+            connections, sent = host.connection_stats()
+            total_conn += connections
+            total_req += sent
+            per_host[host.origin] = {
+                'requests': sent,
+                'connections': connections,
+                'reuse_ratio': round(1 - connections / sent, 3) if sent else None,
+            }
+        return {
+            'hosts': per_host,
+            'requests': total_req,
+            'connections': total_conn,
+            'reuse_ratio': round(1 - total_conn / total_req, 3) if total_req else None,
+        }
+
+
+# 프로세스 전역 풀 (서버 스레드, 피드 스케줄러, 대량 추출 워커가 각자 공유)
+pool = HostPool()
+
+
+def get(url, headers=None, timeout=10, respect_robots=True):
+    return pool.get(url, headers=headers, timeout=timeout, respect_robots=respect_robots)
+
+
+def check(url, headers=None):
+    return pool.check(url, headers=headers)
+
+
+def stats():
+    return pool.stats()
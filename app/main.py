@@ -1,11 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, send_from_directory
 from flask_cors import CORS
 import os
 import sys
 import requests
 import json
 import re
-from extract import fetch_html, extract_text
+import hashlib
+from extract import fetch_page
+from extract_pool import ExtractPool, ExtractQueueFull, ExtractTimeout
+from urlcanon import canonicalize_url, resolve_canonical, url_aliases
+from youtube import is_youtube_url, fetch_transcript, TranscriptUnavailable
+from prompts import build_prompt, get_template, DEFAULT_NUM_CTX
+from dedup import ArticleIndex, DEDUP_ENABLED, content_hash, fingerprint
+from mcp_client import create_uploader
+from feeds import FeedStore, FeedScheduler, FEED_SCHEDULER_ENABLED
+import http_pool
+from http_pool import RobotsDisallowed
+from speculative import SpeculativeRunner, GenerationCancelled
+from profiling import RequestProfiler
+from quizbank import QUIZ_BANK_SIZE, SAMPLE_MODES, parse_bank_response, dedupe_questions, sample_quiz
+import threading
 
 app = Flask(__name__)
 CORS(app)
@@ -13,6 +27,103 @@ CORS(app)
 # Ollama API 설정
 OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'qwen2.5')
+# Ollama 연결을 요청마다 새로 맺지 않도록 keep-alive 세션 재사용
+ollama_session = requests.Session()
+
+# /process, /quiz 성공 응답의 캐시 유효 시간 (초, nginx proxy_cache와 브라우저 공용)
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 3600))
+
+# 유사 문서 인덱스 (퍼가기/미러 글의 요약·퀴즈 재사용)
+article_index = ArticleIndex() if DEDUP_ENABLED else None
+
+# 본문 추출은 워커 프로세스에서 (BeautifulSoup 파싱이 요청 스레드의 GIL을 잡지 않도록)
+extractor = ExtractPool()
+
+# MCP 파일서버 결과 저장 (MCP_HOST 설정 시, 백그라운드 일괄 업로드)
+uploader = create_uploader()
+
+# /process 후 LLM이 한가하면 같은 본문의 퀴즈를 미리 생성 (결과는 article_index에 저장)
+SPECULATIVE_QUIZ = os.environ.get('SPECULATIVE_QUIZ', '0') == '1'
+QUIZ_TIMEOUT = 60
+
+# 퀴즈 뱅크: 글마다 큰 문제 풀을 한 번 만들고 /quiz마다 일부를 골라 응답 (mode 파라미터로도 사용 가능)
+QUIZ_BANK = os.environ.get('QUIZ_BANK', '0') == '1'
+QUIZ_BANK_ROUNDS = int(os.environ.get('QUIZ_BANK_ROUNDS', 2))
+QUIZ_BANK_TIMEOUT = 180
+
+# 처리 중인 사용자 요청 수 (백그라운드 작업은 0일 때만 LLM 사용)
+_inflight = 0
+_inflight_lock = threading.Lock()
+USER_ENDPOINTS = ('process', 'quiz')
+
+
+@app.before_request
+def _track_request_start():
+    global _inflight
+    if request.endpoint in USER_ENDPOINTS:
+        with _inflight_lock:
+            _inflight += 1
+
+
+@app.teardown_request
+def _track_request_end(exc=None):
+    global _inflight
+    if request.endpoint in USER_ENDPOINTS:
+        with _inflight_lock:
+            _inflight -= 1
+
+
+# 요청 단위 프로파일링 (PROFILE_TOKEN / PROFILE_SAMPLE_RATE 설정 시)
+profiler = RequestProfiler()
+
+
+@app.before_request
+def _start_profile():
+    if not profiler.enabled:
+        return
+    mode = profiler.choose_mode(request.headers.get('X-Profile'), request.headers.get('X-Profile-Mode'))
+    if mode and request.endpoint not in ('list_profiles', 'download_profile'):
+        g.profile = profiler.start(mode)
+
+
+@app.after_request
+def _finish_profile(response):
+    handle = g.pop('profile', None)
+    if handle:
+        name = profiler.finish(handle, request.endpoint or 'unknown')
+        response.headers['X-Profile-Id'] = name
+        # 프로파일한 응답은 프록시 캐시에 남기지 않음
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.teardown_request
+def _discard_profile(exc=None):
+    # after_request까지 가지 못한 요청(예외 등)도 샘플러 등록/cProfile을 반드시 해제
+    handle = g.pop('profile', None)
+    if handle:
+        profiler.discard(handle)
+
+
+def is_busy():
+    return _inflight > 0
+
+
+# 피드 사전 요약이 LLM을 쓰는 중 (추측 퀴즈 생성이 양보)
+_prefetching = threading.Event()
+
+
+def llm_busy():
+    """사용자 요청이나 추측 퀴즈 생성이 LLM을 쓰는 중인지 (피드 사전 요약 양보용)"""
+    return is_busy() or (quiz_speculator is not None and quiz_speculator.active())
+
+
+def speculation_busy():
+    """사용자 요청이나 피드 사전 요약이 LLM을 쓰는 중인지 (추측 퀴즈 생성 양보용)"""
+    return is_busy() or _prefetching.is_set()
+
+
+quiz_speculator = SpeculativeRunner(speculation_busy) if SPECULATIVE_QUIZ and article_index else None
 
 
 def has_chinese_or_japanese(text):
@@ -39,73 +150,71 @@ def is_korean_text(text):
     return (korean_chars / total_chars) > 0.3  # 한글이 30% 이상이면 OK
 
 
-def summarize_with_ollama(text, max_tokens=100):
-    """Ollama를 사용하여 텍스트를 요약합니다."""
-    try:
-        prompt = f"""[중요] 반드시 한국어로만 작성하세요. 중국어, 일본어, 영어 사용 금지!
-
-다음 글의 핵심 내용을 한국어로 요약해주세요.
-
-글:
-{text[:800]}
-
-규칙:
-- 반드시 한국어로만 작성 (한글만 사용)
-- 중국어(汉字), 일본어, 영어 절대 사용 금지
-- 3-4문장으로 핵심 내용 정리
-- 주요 개념과 결론 포함
-
-한국어 요약:"""
-        
-        response = requests.post(
-            f'{OLLAMA_HOST}/api/generate',
-            json={
-                'model': OLLAMA_MODEL,
-                'prompt': prompt,
-                'stream': False
-            },
-            timeout=30
-        )
+def ollama_generate(built, timeout, cancel=None):
+    """build_prompt() 결과로 Ollama /api/generate를 호출하고 응답 JSON을 반환합니다.
+
+    cancel이 주어지면 스트리밍으로 받으면서 조각마다 cancel()을 확인하고, True면 연결을 끊어
+    Ollama가 생성을 멈추게 한 뒤 GenerationCancelled를 던집니다.
+    """
+    payload = {
+        'model': OLLAMA_MODEL,
+        'system': built['system'],
+        'prompt': built['prompt'],
+        # 모든 요청이 같은 num_ctx를 써야 모델 재로드 없이 KV 캐시를 공유함.
+        # 출력은 프롬프트 예산에서 뺀 예약분까지만 생성해 컨텍스트를 넘지 않게 함
+        'options': {'num_ctx': DEFAULT_NUM_CTX, 'num_predict': built['reserve_tokens']},
+        'stream': cancel is not None
+    }
+    if cancel is None:
+        response = ollama_session.post(f'{OLLAMA_HOST}/api/generate', json=payload, timeout=timeout)
         response.raise_for_status()
         result = response.json()
+    else:
+        parts = []
+        result = {}
+        with ollama_session.post(f'{OLLAMA_HOST}/api/generate', json=payload,
+                                 timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel():
+                    raise GenerationCancelled('user request arrived')
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(chunk.get('response', ''))
+                if chunk.get('done'):
+                    result = chunk
+                    break
+        result['response'] = ''.join(parts)
+    print(f"Ollama prompt_eval_count: {result.get('prompt_eval_count')} "
+          f"(estimated {built['prompt_tokens']})")
+    return result
+
+
+def summarize_with_ollama(text):
+    """Ollama를 사용하여 텍스트를 요약합니다."""
+    try:
+        built = build_prompt('summary', text, model=OLLAMA_MODEL)
+        print(f"Prompt {built['version']}: ~{built['prompt_tokens']} tokens, "
+              f"text {built['text_chars']} chars (truncated={built['truncated']})")
+        
+        result = ollama_generate(built, timeout=30)
         return result.get('response', '').strip()
     except Exception as e:
         return f'(요약 실패: {str(e)})'
 
 
-def generate_quiz_with_ollama(text):
-    """Ollama를 사용하여 O/X 퀴즈 5개를 생성합니다."""
+def generate_quiz_with_ollama(text, cancel=None):
+    """Ollama를 사용하여 O/X 퀴즈 5개를 생성합니다.
+
+    cancel이 주어지면 생성 도중 cancel()이 True가 될 때 GenerationCancelled를 던집니다.
+    """
     try:
-        prompt = f"""[필수 규칙]
-1. 반드시 한국어로만 작성 (중국어, 일본어, 영어 금지)
-2. 반드시 아래 글에 나온 내용만 사용 (글에 없는 내용 절대 금지)
-3. 추측하거나 지어내지 말 것
-
-글:
-{text[:1000]}
-
-위 글의 내용만을 바탕으로 O/X 퀴즈 5개를 만드세요.
-
-형식:
-1. [글에서 언급된 사실을 바탕으로 한 문장] | O | [글의 어느 부분에서 확인할 수 있는지]
-2. [글의 내용을 살짝 틀리게 바꾼 문장] | X | [왜 틀린지, 글에서 실제로 뭐라고 했는지]
-3. [글에서 언급된 사실을 바탕으로 한 문장] | O | [근거]
-4. [글의 내용을 살짝 틀리게 바꾼 문장] | X | [왜 틀린지]
-5. [글에서 언급된 사실을 바탕으로 한 문장] | O | [근거]
-
-퀴즈:"""
-        
-        response = requests.post(
-            f'{OLLAMA_HOST}/api/generate',
-            json={
-                'model': OLLAMA_MODEL,
-                'prompt': prompt,
-                'stream': False
-            },
-            timeout=60
-        )
-        response.raise_for_status()
-        result = response.json()
+        built = build_prompt('quiz', text, model=OLLAMA_MODEL)
+        print(f"Prompt {built['version']}: ~{built['prompt_tokens']} tokens, "
+              f"text {built['text_chars']} chars (truncated={built['truncated']})")
+        
+        result = ollama_generate(built, timeout=QUIZ_TIMEOUT, cancel=cancel)
         response_text = result.get('response', '').strip()
         
         # 디버그: Ollama 응답 출력
@@ -166,76 +275,543 @@ def generate_quiz_with_ollama(text):
                 continue
         
         return quiz_list
+    except GenerationCancelled:
+        raise
     except Exception as e:
         print(f"Error: 퀴즈 생성 실패: {str(e)}", file=sys.stderr)
         return []
 
 
+def generate_quiz_bank_with_ollama(text, size=QUIZ_BANK_SIZE, rounds=QUIZ_BANK_ROUNDS, cancel=None):
+    """퀴즈 뱅크를 만듭니다. 검증·중복 제거 후 size개가 안 되면 rounds 번까지 더 생성합니다."""
+    bank = []
+    try:
+        built = build_prompt('quiz_bank', text, model=OLLAMA_MODEL, count=size)
+        print(f"Prompt {built['version']}: ~{built['prompt_tokens']} tokens, "
+              f"text {built['text_chars']} chars (truncated={built['truncated']})")
+        for i in range(rounds):
+            result = ollama_generate(built, timeout=QUIZ_BANK_TIMEOUT, cancel=cancel)
+            items = parse_bank_response(result.get('response', ''))
+            bank = dedupe_questions(bank + items)
+            print(f'Quiz bank round {i + 1}: parsed {len(items)} items, {len(bank)} unique')
+            if len(bank) >= size:
+                break
+    except GenerationCancelled:
+        raise
+    except Exception as e:
+        print(f"Error: 퀴즈 뱅크 생성 실패: {str(e)}", file=sys.stderr)
+    return bank[:size]
+
+
 @app.route('/health')
 def health():
     return jsonify({'status': 'ok'})
 
 
-@app.route('/process', methods=['POST'])
+def _profile_admin_allowed():
+    return profiler.authorized(request.headers.get('X-Profile-Token'))
+
+
+@app.route('/admin/profiles')
+def list_profiles():
+    """저장된 프로파일 목록 (X-Profile-Token 헤더 필요)"""
+    if not _profile_admin_allowed():
+        return error_response('not found', 404)
+    return jsonify({'profiles': profiler.list(), 'sample_rate': profiler.sample_rate})
+
+
+@app.route('/admin/profiles/<name>')
+def download_profile(name):
+    if not _profile_admin_allowed():
+        return error_response('not found', 404)
+    return send_from_directory(profiler.directory, name, as_attachment=True)
+
+
+@app.route('/stats/fetch')
+def fetch_stats():
+    """호스트별 요청 수, 새 연결 수, 연결 재사용률"""
+    return jsonify(http_pool.stats())
+
+
+@app.route('/stats/extract')
+def extract_stats():
+    """본문 추출 프로세스 풀 통계 (처리/거절/시간 초과/재시작 수)"""
+    return jsonify({'workers': extractor.workers, **dict(extractor.stats)})
+
+
+@app.route('/stats/speculative')
+def speculative_stats():
+    """추측 퀴즈 생성 통계 (예약/완료/취소/버림 수, 대기 목록)"""
+    if not quiz_speculator:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **quiz_speculator.stats, 'pending': quiz_speculator.pending()})
+
+
+def load_article(url):
+    """URL을 가져와 본문을 추출하고 정규화된 URL 정보와 함께 반환합니다.
+
+    YouTube 영상이면 페이지 대신 자막만 가져와 본문으로 사용합니다.
+    유사 문서 검색용 'simhash', 'content_hash'는 추출 워커가 계산해 온 값을 그대로 넘깁니다.
+    """
+    if is_youtube_url(url):
+        print(f'YouTube video detected, fetching subtitles: {url}')
+        doc = fetch_transcript(url)
+        print(f"Transcript - Title: {doc['title']}, Text length: {len(doc['text'])}, lang: {doc['lang']}")
+        return {
+            'title': doc['title'],
+            'text': doc['text'],
+            'canonical_url': canonicalize_url(doc['canonical_url']),
+            'aliases': url_aliases(url, doc['final_url'], doc['canonical_url']),
+            **fingerprint(doc['text']),
+        }
+    
+    print(f'Fetching: {url}')
+    page = fetch_page(url)
+    if page.get('doc'):
+        # 브라우저 안에서 이미 추출함 (HTML 전송·재파싱 없음)
+        print(f"Extracted in browser, final URL: {page['final_url']}")
+        doc = {**page['doc'], **fingerprint(page['doc']['text'])}
+    else:
+        print(f"HTML length: {len(page['html'])}, final URL: {page['final_url']}")
+        doc = extractor.extract(page['html'], url=page['final_url'] or url)
+    canonical_url = resolve_canonical(url, page['final_url'], doc['canonical_url'])
+    print(f"Extracted - Title: {doc['title']}, Text length: {len(doc['text'])}, canonical: {canonical_url}")
+    
+    return {
+        'title': doc['title'],
+        'text': doc['text'],
+        'canonical_url': canonical_url,
+        'aliases': url_aliases(url, page['final_url'], canonical_url),
+        'simhash': doc['simhash'],
+        'content_hash': doc['content_hash'],
+    }
+
+
+def request_param(name, default=None):
+    """GET 쿼리 또는 POST JSON 본문에서 값을 읽습니다."""
+    if request.method == 'GET':
+        return request.args.get(name, default)
+    return (request.get_json(silent=True) or {}).get(name, default)
+
+
+def request_url():
+    """GET 쿼리(?url=) 또는 POST JSON 본문에서 url을 읽습니다."""
+    return request_param('url')
+
+
+def prompt_version(kind):
+    """지금 설정된 프롬프트 템플릿 버전 (새로 만든 결과와 함께 저장)"""
+    return get_template(kind)[0]
+
+
+def result_etag(kind, canonical_url, text_hash, version=None):
+    """정규 URL + 본문 해시 + 모델 + 프롬프트 버전으로 결과 ETag를 만듭니다.
+
+    캐시된 결과는 그 결과를 만든 버전(인덱스에 저장된 값)을 넘길 것.
+    버전이 기록되지 않은 옛 결과와 새로 만든 결과는 현재 설정된 버전을 씁니다.
+    """
+    version = version or prompt_version(kind)
+    raw = f'{kind}|{canonical_url}|{text_hash}|{OLLAMA_MODEL}|{version}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def cacheable_response(payload, etag=None):
+    """ETag가 있으면 캐시 가능한 응답으로, If-None-Match가 일치하면 304로 응답합니다."""
+    if etag and request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = jsonify(payload)
+    if etag:
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = f'public, max-age={HTTP_CACHE_MAX_AGE}'
+    else:
+        resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+def error_response(message, status):
+    resp = jsonify({'error': message})
+    resp.status_code = status
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+def summarize_url(url, speculate=False):
+    """URL의 요약을 캐시에서 찾거나 새로 생성합니다. 반환값: (응답 payload, ETag 또는 None)
+
+    /process와 피드 사전 요약이 함께 사용합니다. speculate=True면 본문을 새로 가져온 경우
+    퀴즈가 아직 없을 때 추측 퀴즈 생성을 예약합니다.
+    """
+    # 1. 이미 처리한 URL이면 가져오기 생략
+    cached = article_index.find_by_url(url) if article_index else None
+    if cached and cached['summary']:
+        print(f'Cache hit for {canonicalize_url(url)}')
+        return {
+            'url': url,
+            'canonical_url': cached['canonical_url'],
+            'title': cached['title'],
+            'text_length': cached['text_length'],
+            'summary': cached['summary']
+        }, result_etag('summary', cached['canonical_url'], cached['content_hash'], cached['summary_version'])
+    
+    # 2. HTML 가져오기 + 본문 추출
+    article = load_article(url)
+    title, text = article['title'], article['text']
+    
+    # 3. 같은 canonical URL 또는 유사 문서의 요약이 있으면 재사용
+    match = None
+    if article_index:
+        match = article_index.find_by_url(article['canonical_url']) or article_index.find(text, hashes=article)
+    if match and match['summary']:
+        print(f"Duplicate of {match['url']} (similarity {match['similarity']:.2f}), reusing summary")
+        article_index.add_aliases(match['id'], article['aliases'])
+        if speculate and not match['quiz']:
+            speculate_quiz(url, article)
+        return {
+            'url': url,
+            'canonical_url': article['canonical_url'],
+            'title': title,
+            'text_length': len(text),
+            'summary': match['summary'],
+            'duplicate_of': match['url']
+        }, result_etag('summary', match['canonical_url'], match['content_hash'], match['summary_version'])
+    
+    # 4. Ollama로 요약
+    print('Summarizing with Ollama...')
+    summary = summarize_with_ollama(text)
+    print(f'Summary: {summary[:100]}...')
+    
+    etag = None
+    if not summary.startswith('(요약 실패'):
+        etag = stored_etag('summary', article, match)
+        if article_index:
+            article_index.record(url, title, text, match=match, summary=summary,
+                                 summary_version=prompt_version('summary'),
+                                 aliases=article['aliases'], canonical_url=article['canonical_url'],
+                                 hashes=article)
+        if uploader:
+            uploader.save_summary(url, title, summary, article['canonical_url'])
+        if speculate:
+            speculate_quiz(url, article)
+    
+    # 유사 문서에 합쳐 저장했으면 이후 캐시 적중과 같은 응답이 되도록 그 행의 정보로 응답
+    row = match or {'canonical_url': article['canonical_url'], 'title': title, 'text_length': len(text)}
+    return {
+        'url': url,
+        'canonical_url': row['canonical_url'],
+        'title': row['title'],
+        'text_length': row['text_length'],
+        'summary': summary
+    }, etag
+
+
+def article_hash(article):
+    """load_article이 받아 둔 content_hash (테스트 등에서 없으면 계산)"""
+    return article.get('content_hash') or content_hash(article['text'])
+
+
+def stored_etag(kind, article, match):
+    """새 결과를 저장한 행 기준 ETag (유사 문서 match에 합쳐 저장했으면 그 행)
+
+    이후 캐시 적중은 저장된 행의 canonical_url/content_hash로 ETag를 만들므로 같은 값이 나와야 함.
+    """
+    if match:
+        return result_etag(kind, match['canonical_url'], match['content_hash'])
+    return result_etag(kind, article['canonical_url'], article_hash(article))
+
+
+def store_quiz(url, article, match, quiz_list):
+    """생성한 퀴즈를 인덱스와 MCP 서버에 저장하고 ETag를 반환합니다. (빈 퀴즈면 None)"""
+    if not quiz_list:
+        return None
+    if article_index:
+        article_index.record(url, article['title'], article['text'], match=match, quiz=quiz_list,
+                             quiz_version=prompt_version('quiz'),
+                             aliases=article['aliases'], canonical_url=article['canonical_url'],
+                             hashes=article)
+    if uploader:
+        uploader.save_quiz(url, article['title'], quiz_list, article['canonical_url'])
+    return stored_etag('quiz', article, match)
+
+
+def store_quiz_bank(url, article, match, bank):
+    """퀴즈 뱅크를 글에 저장하고 MCP 서버에도 올립니다."""
+    if not bank:
+        return
+    if article_index:
+        article_id = article_index.record(url, article['title'], article['text'], match=match,
+                                          aliases=article['aliases'], canonical_url=article['canonical_url'],
+                                          hashes=article)
+        if article_id:
+            article_index.save_quiz_bank(article_id, bank, version=prompt_version('quiz_bank'))
+    if uploader:
+        uploader.save_quiz(url, article['title'], bank, article['canonical_url'])
+
+
+def can_store(article, match):
+    """생성 결과를 인덱스에 저장할 수 있는지 (유사 문서 행이 있거나, 새 행으로 넣을 만큼 본문이 긴지)"""
+    return bool(article_index) and (match is not None or article_index.indexable(article['text']))
+
+
+def speculate_quiz(url, article):
+    """이미 추출한 본문으로 퀴즈(뱅크 모드면 퀴즈 뱅크) 생성을 낮은 우선순위로 예약합니다."""
+    if not quiz_speculator:
+        return
+
+    def task(cancel):
+        match = article_index.find_by_url(article['canonical_url'])
+        if not can_store(article, match):
+            return
+        if QUIZ_BANK:
+            if match and article_index.quiz_bank(match['id']):
+                return
+            quiz_list = generate_quiz_bank_with_ollama(article['text'], cancel=cancel)
+            store_quiz_bank(url, article, match, quiz_list)
+        else:
+            if match and match['quiz']:
+                return
+            quiz_list = generate_quiz_with_ollama(article['text'], cancel=cancel)
+            store_quiz(url, article, match, quiz_list)
+        print(f"Speculative quiz stored for {article['canonical_url']} ({len(quiz_list)} items)")
+
+    quiz_speculator.submit(canonicalize_url(url), task)
+
+
+def find_quiz_bank(url):
+    """URL의 퀴즈 뱅크를 찾거나 만듭니다.
+
+    반환값: (뱅크, {'title', 'canonical_url', 'content_hash', 'version'[, 'duplicate_of']})
+    뱅크를 저장할 수 없는 글(짧은 본문 등)이면 만들지 않고 (None, 불러온 글)을 반환합니다.
+    """
+    cached = article_index.find_by_url(url) if article_index else None
+    bank = article_index.quiz_bank(cached['id']) if cached else None
+    if bank:
+        print(f'Quiz bank hit for {canonicalize_url(url)}')
+        return bank, {'title': cached['title'], 'canonical_url': cached['canonical_url'],
+                      'content_hash': cached['content_hash'], 'version': cached['quiz_bank_version']}
+
+    article = load_article(url)
+    match = None
+    if article_index:
+        match = (article_index.find_by_url(article['canonical_url'])
+                 or article_index.find(article['text'], hashes=article))
+    bank = article_index.quiz_bank(match['id']) if match else None
+    if bank:
+        print(f"Duplicate of {match['url']} (similarity {match['similarity']:.2f}), reusing quiz bank")
+        article_index.add_aliases(match['id'], article['aliases'])
+        return bank, {'title': article['title'], 'canonical_url': match['canonical_url'],
+                      'content_hash': match['content_hash'], 'version': match['quiz_bank_version'],
+                      'duplicate_of': match['url']}
+
+    if not can_store(article, match):
+        return None, article
+
+    bank = generate_quiz_bank_with_ollama(article['text'])
+    store_quiz_bank(url, article, match, bank)
+    # 유사 문서에 합쳐 저장했으면 이후 캐시 적중과 같은 행 기준으로 응답
+    row = match or {'title': article['title'], 'canonical_url': article['canonical_url'],
+                    'content_hash': article_hash(article)}
+    return bank, {'title': row['title'], 'canonical_url': row['canonical_url'],
+                  'content_hash': row['content_hash'], 'version': None}
+
+
+def bank_quiz_url(url, mode, count=5, seed=None):
+    """퀴즈 뱅크에서 count개를 골라 반환합니다. 반환값: (응답 payload, ETag 또는 None)
+
+    무작위 선택은 요청마다 달라야 하므로 seed를 준 경우에만 캐시 가능한 ETag를 붙입니다.
+    """
+    bank, info = find_quiz_bank(url)
+    if bank is None:
+        # 저장되지 않는 뱅크를 /quiz마다 다시 만들지 않도록 일반 퀴즈로 응답
+        print(f"Quiz bank can't be stored for {info['canonical_url']}, falling back to plain quiz")
+        return new_quiz(url, info, None)
+    quiz_list = sample_quiz(bank, count=count, mode=mode, seed=seed)
+    payload = {
+        'url': url,
+        'canonical_url': info['canonical_url'],
+        'title': info['title'],
+        'quiz_count': len(quiz_list),
+        'quiz': quiz_list,
+        'bank_size': len(bank),
+        'mode': mode,
+    }
+    if 'duplicate_of' in info:
+        payload['duplicate_of'] = info['duplicate_of']
+    etag = None
+    if bank and seed is not None:
+        base = result_etag('quiz_bank', info['canonical_url'], info['content_hash'], info['version'])
+        etag = hashlib.sha256(f'{base}|{mode}|{count}|{seed}'.encode('utf-8')).hexdigest()[:32]
+    return payload, etag
+
+
+def quiz_url(url, mode=None, count=5, seed=None):
+    """URL의 퀴즈를 캐시에서 찾거나 새로 생성합니다. 반환값: (응답 payload, ETag 또는 None)
+
+    mode('random' 또는 'balanced')를 주거나 QUIZ_BANK=1이면 퀴즈 뱅크에서 골라 응답합니다.
+    """
+    if quiz_speculator:
+        # 추측 생성이 진행 중이면 끝나길 기다렸다가 저장된 결과 사용, 대기 중이면 직접 생성
+        quiz_speculator.join(canonicalize_url(url), timeout=QUIZ_BANK_TIMEOUT if QUIZ_BANK else QUIZ_TIMEOUT)
+    if mode or QUIZ_BANK:
+        return bank_quiz_url(url, mode or 'balanced', count=count, seed=seed)
+    cached = article_index.find_by_url(url) if article_index else None
+    if cached and cached['quiz']:
+        print(f'Cache hit for {canonicalize_url(url)}')
+        return {
+            'url': url,
+            'canonical_url': cached['canonical_url'],
+            'title': cached['title'],
+            'quiz_count': len(cached['quiz']),
+            'quiz': cached['quiz']
+        }, result_etag('quiz', cached['canonical_url'], cached['content_hash'], cached['quiz_version'])
+    
+    article = load_article(url)
+    title, text = article['title'], article['text']
+    
+    match = None
+    if article_index:
+        match = article_index.find_by_url(article['canonical_url']) or article_index.find(text, hashes=article)
+    if match and match['quiz']:
+        print(f"Duplicate of {match['url']} (similarity {match['similarity']:.2f}), reusing quiz")
+        article_index.add_aliases(match['id'], article['aliases'])
+        return {
+            'url': url,
+            'canonical_url': article['canonical_url'],
+            'title': title,
+            'quiz_count': len(match['quiz']),
+            'quiz': match['quiz'],
+            'duplicate_of': match['url']
+        }, result_etag('quiz', match['canonical_url'], match['content_hash'], match['quiz_version'])
+    
+    return new_quiz(url, article, match)
+
+
+def new_quiz(url, article, match):
+    """불러온 본문으로 퀴즈를 새로 생성해 저장합니다. 반환값: (응답 payload, ETag 또는 None)"""
+    quiz_list = generate_quiz_with_ollama(article['text'])
+    etag = store_quiz(url, article, match, quiz_list)
+    
+    row = match or {'canonical_url': article['canonical_url'], 'title': article['title']}
+    return {
+        'url': url,
+        'canonical_url': row['canonical_url'],
+        'title': row['title'],
+        'quiz_count': len(quiz_list),
+        'quiz': quiz_list
+    }, etag
+
+
+@app.route('/process', methods=['GET', 'POST'])
 def process():
-    """URL의 본문을 추출하고 Ollama로 요약합니다."""
+    """URL의 본문을 추출하고 Ollama로 요약합니다. (GET ?url= 은 프록시 캐시용)"""
     try:
-        data = request.json or {}
-        url = data.get('url')
+        url = request_url()
         
         if not url:
-            return jsonify({'error': 'url required'}), 400
+            return error_response('url required', 400)
         
-        # 1. HTML 가져오기
-        print(f'Fetching: {url}')
-        html = fetch_html(url)
-        print(f'HTML length: {len(html)}')
-        
-        # 2. 본문 추출
-        title, text = extract_text(html, url=url)
-        print(f'Extracted - Title: {title}, Text length: {len(text)}')
-        
-        # 3. Ollama로 요약
-        print('Summarizing with Ollama...')
-        summary = summarize_with_ollama(text)
-        print(f'Summary: {summary[:100]}...')
-        
-        return jsonify({
-            'url': url,
-            'title': title,
-            'text_length': len(text),
-            'summary': summary
-        })
+        payload, etag = summarize_url(url, speculate=SPECULATIVE_QUIZ)
+        return cacheable_response(payload, etag)
+    except RobotsDisallowed as e:
+        return error_response(str(e), 403)
+    except (ExtractQueueFull, ExtractTimeout) as e:
+        return error_response(str(e), 503)
+    except TranscriptUnavailable as e:
+        return error_response(str(e), 422)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(str(e), 500)
 
 
-@app.route('/quiz', methods=['POST'])
+@app.route('/quiz', methods=['GET', 'POST'])
 def quiz():
-    """URL의 본문을 추출하고 퀴즈를 생성합니다."""
+    """URL의 본문을 추출하고 퀴즈를 생성합니다. (GET ?url= 은 프록시 캐시용)
+
+    퀴즈 뱅크 옵션: mode=random|balanced, count=문제 수(기본 5), seed=같은 문제 조합 재현용
+    """
     try:
-        data = request.json or {}
-        url = data.get('url')
+        url = request_url()
         
         if not url:
-            return jsonify({'error': 'url required'}), 400
+            return error_response('url required', 400)
         
-        html = fetch_html(url)
-        title, text = extract_text(html, url=url)
-        quiz_list = generate_quiz_with_ollama(text)
+        mode = request_param('mode')
+        if mode is not None and mode not in SAMPLE_MODES:
+            return error_response(f'mode must be one of {", ".join(SAMPLE_MODES)}', 400)
+        try:
+            count = int(request_param('count', 5))
+        except (TypeError, ValueError):
+            return error_response('count must be an integer', 400)
+        seed = request_param('seed')
+        # JSON 본문의 리스트/객체 seed는 random.Random()에 넣을 수 없음
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (str, int))):
+            return error_response('seed must be a string or an integer', 400)
         
-        return jsonify({
-            'url': url,
-            'title': title,
-            'quiz_count': len(quiz_list),
-            'quiz': quiz_list
-        })
+        payload, etag = quiz_url(url, mode=mode, count=max(1, count), seed=seed)
+        return cacheable_response(payload, etag)
+    except RobotsDisallowed as e:
+        return error_response(str(e), 403)
+    except (ExtractQueueFull, ExtractTimeout) as e:
+        return error_response(str(e), 503)
+    except TranscriptUnavailable as e:
+        return error_response(str(e), 422)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(str(e), 500)
+
+
+@app.route('/feeds', methods=['GET'])
+def list_feeds():
+    """구독 중인 피드와 대기 중인 사전 요약 수"""
+    return jsonify({'feeds': feed_store.feeds()})
+
+
+@app.route('/feeds', methods=['POST'])
+def subscribe_feed():
+    """RSS/Atom 피드 또는 사이트맵 구독. 본문: {"url": ...}"""
+    url = (request.get_json(silent=True) or {}).get('url')
+    if not url:
+        return error_response('url required', 400)
+    feed_store.subscribe(url)
+    feed_scheduler.trigger()
+    return jsonify({'subscribed': url}), 201
+
+
+@app.route('/feeds', methods=['DELETE'])
+def unsubscribe_feed():
+    url = request.args.get('url') or (request.get_json(silent=True) or {}).get('url')
+    if not url:
+        return error_response('url required', 400)
+    feed_store.unsubscribe(url)
+    return jsonify({'unsubscribed': url})
+
+
+@app.route('/feeds/poll', methods=['POST'])
+def poll_feeds():
+    """피드를 즉시 확인하도록 스케줄러를 깨웁니다."""
+    feed_scheduler.trigger()
+    return jsonify({'status': 'scheduled'}), 202
+
+
+def prefetch_summary(url):
+    """피드 글 사전 요약. 요약에 실패하면 예외를 던져 스케줄러가 실패로 기록하고 재시도하게 함"""
+    _prefetching.set()
+    try:
+        payload, _ = summarize_url(url)
+    finally:
+        _prefetching.clear()
+    if payload['summary'].startswith('(요약 실패'):
+        raise RuntimeError(payload['summary'])
+
+
+# 피드 구독 + 사전 요약 (한가한 시간대에 새 글을 미리 요약해 캐시에 저장)
+feed_store = FeedStore()
+feed_scheduler = FeedScheduler(feed_store, process_entry=prefetch_summary, is_busy=llm_busy)
+if FEED_SCHEDULER_ENABLED:
+    feed_scheduler.start()
 
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
     print(f'Starting server on port {port}')
     print(f'Ollama host: {OLLAMA_HOST}, Model: {OLLAMA_MODEL}')
+    extractor.start()
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,152 @@
+"""요약/퀴즈 결과를 MCP 파일서버에 마크다운으로 저장하는 비동기 업로더.
+
+요청 처리 경로에서는 큐에 넣기만 하고, 백그라운드 스레드가 일정 개수나 시간마다
+모아서 /upload/batch 로 gzip 압축해 전송합니다. 큐가 가득 차거나 서버가 죽어 있어도
+/process, /quiz 응답은 지연되지 않습니다 (결과 저장은 best-effort).
+"""
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from urlcanon import canonical_key
+
+MCP_HOST = os.environ.get('MCP_HOST')
+MCP_PORT = os.environ.get('MCP_PORT', '3000')
+if MCP_HOST and '://' in MCP_HOST:
+    MCP_URL = MCP_HOST
+else:
+    MCP_URL = os.environ.get('MCP_URL') or (f'http://{MCP_HOST}:{MCP_PORT}' if MCP_HOST else None)
+
+BATCH_SIZE = int(os.environ.get('MCP_BATCH_SIZE', 20))
+FLUSH_INTERVAL = float(os.environ.get('MCP_FLUSH_INTERVAL', 2.0))
+QUEUE_SIZE = int(os.environ.get('MCP_QUEUE_SIZE', 1000))
+MAX_RETRIES = 3
+
+
+def summary_markdown(url, title, summary, canonical_url=None):
+    return (
+        f"# {title or '(제목 없음)'}\n\n"
+        f"- URL: {url}\n"
+        f"- Canonical: {canonical_url or url}\n\n"
+        f"## 요약\n\n{summary}\n"
+    )
+
+
+def quiz_markdown(url, title, quiz_list, canonical_url=None):
+    lines = [
+        f"# {title or '(제목 없음)'} - O/X 퀴즈",
+        '',
+        f'- URL: {url}',
+        f'- Canonical: {canonical_url or url}',
+        '',
+    ]
+    for i, q in enumerate(quiz_list, 1):
+        answer = 'O' if q.get('answer') else 'X'
+        lines.append(f"{i}. {q.get('question')} **[{answer}]**")
+        lines.append(f"   - 해설: {q.get('explanation', '')}")
+        lines.append(f"   - 중요도: {q.get('importance', '')}")
+    return '\n'.join(lines) + '\n'
+
+
+class MCPUploader:
+    """파일을 모아서 MCP 파일서버로 일괄 업로드하는 백그라운드 워커"""
+
+    def __init__(self, base_url, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 queue_size=QUEUE_SIZE, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session = session or requests.Session()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='mcp-uploader', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, filename, content):
+        """업로드할 파일을 큐에 넣습니다. 큐가 가득 차면 버리고 False 반환."""
+        try:
+            with self._pending_lock:
+                self._queue.put_nowait({'filename': filename, 'content': content})
+                self._pending += 1
+            return True
+        except queue.Full:
+            print(f'MCP upload queue full, dropping {filename}')
+            return False
+
+    def save_summary(self, url, title, summary, canonical_url=None):
+        key = canonical_key(canonical_url or url)
+        return self.enqueue(f'{key}-summary.md', summary_markdown(url, title, summary, canonical_url))
+
+    def save_quiz(self, url, title, quiz_list, canonical_url=None):
+        key = canonical_key(canonical_url or url)
+        return self.enqueue(f'{key}-quiz.md', quiz_markdown(url, title, quiz_list, canonical_url))
+
+    def _collect(self):
+        """첫 항목을 기다린 뒤 batch_size 또는 flush_interval 중 먼저 도달할 때까지 모읍니다."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        body = gzip.compress(json.dumps({'files': batch}, ensure_ascii=False).encode('utf-8'))
+        for attempt in range(MAX_RETRIES):
+            try:
+                resp = self.session.post(
+                    f'{self.base_url}/upload/batch',
+                    data=body,
+                    headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'},
+                    timeout=10,
+                )
+                resp.raise_for_status()
+                return True
+            except Exception as e:
+                print(f'MCP batch upload failed ({attempt + 1}/{MAX_RETRIES}): {e}')
+                if self._stop.wait(2 ** attempt):
+                    break
+        return False
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._send(batch)
+                with self._pending_lock:
+                    self._pending -= len(batch)
+
+    def flush(self, timeout=10):
+        """큐에 들어간 파일의 전송 시도가 모두 끝날 때까지 기다립니다."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def close(self, timeout=10):
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+def create_uploader():
+    """MCP_HOST/MCP_URL 이 설정되어 있을 때만 업로더를 만듭니다."""
+    if not MCP_URL:
+        return None
+    print(f'Persisting results to MCP file server: {MCP_URL}')
+    return MCPUploader(MCP_URL)
@@ -0,0 +1,180 @@
+"""요청 단위 프로파일링 (기본 꺼짐, 꺼져 있으면 요청마다 조건 확인 한 번만 함).
+
+- 요청 시 프로파일: PROFILE_TOKEN을 설정하고 요청에 'X-Profile: <토큰>' 헤더를 붙이면
+  그 요청을 cProfile로 기록합니다 (.prof, pstats/snakeviz 용).
+  'X-Profile-Mode: sample'이면 샘플링 프로파일러를 씁니다.
+  토큰은 접근 로그·Referer에 남지 않도록 헤더로만 받습니다 (쿼리 문자열 X).
+- 상시 샘플링: PROFILE_SAMPLE_RATE(0.0~1.0) 비율의 요청을 샘플링 프로파일러로 기록합니다.
+  결과는 flamegraph.pl / speedscope에 바로 넣을 수 있는 collapsed stack 형식(.collapsed)입니다.
+- 파일은 PROFILE_DIR에 최대 PROFILE_MAX_FILES 개까지 두고 오래된 것부터 지웁니다.
+"""
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from config import CACHE_DIR
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(CACHE_DIR, 'profiles'))
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+PROFILE_EXTENSIONS = ('.prof', '.collapsed')
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def collapse_stack(frame):
+    """프레임을 'root;...;leaf' 문자열로 (flamegraph collapsed 형식)"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """등록된 스레드들의 호출 스택을 interval 마다 모으는 백그라운드 스레드
+
+    샘플링할 요청이 있을 때만 돌고, 없으면 멈춰 있습니다.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, ident):
+        counts = Counter()
+        with self._lock:
+            self._threads[ident] = counts
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return counts
+
+    def remove(self, ident):
+        with self._lock:
+            return self._threads.pop(ident, Counter())
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                targets = dict(self._threads)
+                # 비어 있는 것을 확인한 락 안에서 clear 해야 그 사이 add()의 set()을 놓치지 않음
+                if not targets:
+                    self._wake.clear()
+            if not targets:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for ident, counts in targets.items():
+                frame = frames.get(ident)
+                if frame is not None and ident != me:
+                    counts[collapse_stack(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class RequestProfiler:
+    """요청별 프로파일 시작/종료와 파일 관리"""
+
+    def __init__(self, directory=PROFILE_DIR, token=PROFILE_TOKEN, sample_rate=PROFILE_SAMPLE_RATE,
+                 max_files=PROFILE_MAX_FILES, sampler=None):
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.sampler = sampler or StackSampler()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.token) or self.sample_rate > 0
+
+    def authorized(self, token):
+        if not self.token or not token:
+            return False
+        # 응답 시간으로 토큰을 한 글자씩 맞춰 보지 못하도록 상수 시간 비교
+        return hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8'))
+
+    def choose_mode(self, flag, mode=None):
+        """이 요청을 프로파일할지 정합니다. 반환값: 'cprofile', 'sample' 또는 None"""
+        if flag and self.authorized(flag):
+            return 'sample' if mode == 'sample' else 'cprofile'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def start(self, mode):
+        if mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                return {'mode': mode, 'profile': profile, 'started': time.perf_counter()}
+            except ValueError:
+                # 3.12+는 프로세스에 cProfile 하나만 켤 수 있으므로 샘플링으로 대체
+                mode = 'sample'
+        ident = threading.get_ident()
+        self.sampler.add(ident)
+        return {'mode': mode, 'ident': ident, 'started': time.perf_counter()}
+
+    def finish(self, handle, label):
+        """프로파일을 멈추고 파일로 저장한 뒤 파일 이름을 반환합니다."""
+        elapsed_ms = (time.perf_counter() - handle['started']) * 1000
+        os.makedirs(self.directory, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{int(elapsed_ms)}ms-{uuid.uuid4().hex[:8]}"
+        if handle['mode'] == 'cprofile':
+            handle['profile'].disable()
+            name = f'{stem}.prof'
+            handle['profile'].dump_stats(os.path.join(self.directory, name))
+        else:
+            counts = self.sampler.remove(handle['ident'])
+            name = f'{stem}.collapsed'
+            with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+                for stack, count in counts.most_common():
+                    f.write(f'{stack} {count}\n')
+        self._prune()
+        return name
+
+    def discard(self, handle):
+        """저장하지 않고 프로파일을 멈춥니다 (finish 전에 요청이 예외로 끝난 경우)."""
+        if handle['mode'] == 'cprofile':
+            handle['profile'].disable()
+        else:
+            self.sampler.remove(handle['ident'])
+
+    def _prune(self):
+        with self._lock:
+            files = self.list()
+            for info in files[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, info['name']))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        """저장된 프로파일 목록 (최신순)"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(PROFILE_EXTENSIONS):
+                stat = entry.stat()
+                files.append({'name': entry.name, 'size': stat.st_size, 'modified': stat.st_mtime,
+                              'kind': 'cprofile' if entry.name.endswith('.prof') else 'collapsed'})
+        files.sort(key=lambda f: f['modified'], reverse=True)
+        return files
@@ -0,0 +1,177 @@
+"""Ollama 프롬프트 템플릿 레지스트리와 토큰 예산 계산.
+
+- 템플릿은 (이름, 버전) 단위로 등록되며 환경변수로 버전을 골라 A/B 할 수 있습니다.
+- 모든 템플릿은 같은 시스템 프롬프트(SYSTEM_PREFIX)를 공유하고, 고정된 지시문을
+  앞에, 글 본문을 맨 뒤에 두어 Ollama의 프롬프트(KV) 캐시가 최대한 재사용되도록 합니다.
+- 본문은 모델의 컨텍스트 길이에서 고정 부분과 출력 예약분을 뺀 예산만큼만 채웁니다.
+"""
+import os
+import re
+
+# 모든 요청에서 동일해야 캐시가 재사용되므로 문자열을 바꾸면 버전도 올릴 것
+SYSTEM_PREFIX = """당신은 한국어 글을 읽고 정리하는 도우미입니다.
+[필수 규칙]
+1. 반드시 한국어로만 작성 (한글만 사용, 중국어(汉字), 일본어, 영어 절대 사용 금지)
+2. 반드시 주어진 글에 나온 내용만 사용 (글에 없는 내용 절대 금지)
+3. 추측하거나 지어내지 말 것"""
+
+PROMPT_TEMPLATES = {
+    ('summary', 'v1'): {
+        'system': SYSTEM_PREFIX,
+        'instructions': """다음 글의 핵심 내용을 한국어로 요약해주세요.
+
+규칙:
+- 3-4문장으로 핵심 내용 정리
+- 주요 개념과 결론 포함""",
+        'suffix': '한국어 요약:',
+        'reserve_tokens': 300,
+    },
+    ('quiz', 'v1'): {
+        'system': SYSTEM_PREFIX,
+        'instructions': """아래 글의 내용만을 바탕으로 O/X 퀴즈 5개를 만드세요.
+
+형식:
+1. [글에서 언급된 사실을 바탕으로 한 문장] | O | [글의 어느 부분에서 확인할 수 있는지]
+2. [글의 내용을 살짝 틀리게 바꾼 문장] | X | [왜 틀린지, 글에서 실제로 뭐라고 했는지]
+3. [글에서 언급된 사실을 바탕으로 한 문장] | O | [근거]
+4. [글의 내용을 살짝 틀리게 바꾼 문장] | X | [왜 틀린지]
+5. [글에서 언급된 사실을 바탕으로 한 문장] | O | [근거]""",
+        'suffix': '퀴즈:',
+        'reserve_tokens': 600,
+    },
+    # 퀴즈 뱅크용: 한 번에 많이 만들고 난이도를 함께 받음 (quizbank.parse_bank_response)
+    ('quiz_bank', 'v1'): {
+        'system': SYSTEM_PREFIX,
+        'instructions': """아래 글의 내용만을 바탕으로 서로 다른 O/X 퀴즈 {count}개를 만드세요.
+
+규칙:
+- O와 X 문제를 절반씩 섞을 것 (X는 글의 내용을 살짝 틀리게 바꾼 문장)
+- 난이도는 상/중/하 중 하나 (하: 글에 그대로 나온 사실, 상: 여러 문단을 종합해야 하는 내용)
+- 같은 내용을 묻는 문제를 반복하지 말 것
+
+형식 (한 줄에 하나):
+1. [문장] | O | 하 | [글의 어느 부분에서 확인할 수 있는지]
+2. [문장] | X | 중 | [왜 틀린지, 글에서 실제로 뭐라고 했는지]""",
+        'suffix': '퀴즈:',
+        # 출력 예약분 = reserve_tokens + 문제 하나당 reserve_tokens_per_item × count
+        'reserve_tokens': 100,
+        'reserve_tokens_per_item': 110,
+    },
+}
+
+# 템플릿별 기본 버전 (PROMPT_SUMMARY_VERSION, PROMPT_QUIZ_VERSION 으로 변경)
+DEFAULT_VERSIONS = {
+    'summary': 'v1',
+    'quiz': 'v1',
+    'quiz_bank': 'v1',
+}
+
+# Ollama 컨텍스트 길이. 모든 요청이 같은 값을 써야 함 (num_ctx가 바뀌면 Ollama가 모델을
+# 다시 올리고 공유 프롬프트 KV 캐시도 버림). 가장 큰 출력인 퀴즈 뱅크가 들어가는 크기로 둠
+DEFAULT_NUM_CTX = int(os.environ.get('OLLAMA_NUM_CTX', 4096))
+
+# 모델 계열별 문자당 토큰 수 추정치 (한글, 한자/가나, 그 외)
+# 토크나이저를 직접 돌릴 수 없으므로 약간 보수적으로 잡습니다.
+MODEL_TOKEN_RATIOS = {
+    'qwen': {'hangul': 1.0, 'cjk': 1.0, 'other': 0.3},
+    'llama': {'hangul': 1.6, 'cjk': 1.5, 'other': 0.3},
+    'gemma': {'hangul': 0.8, 'cjk': 0.9, 'other': 0.3},
+    'mistral': {'hangul': 1.8, 'cjk': 1.6, 'other': 0.3},
+}
+DEFAULT_TOKEN_RATIO = {'hangul': 1.6, 'cjk': 1.5, 'other': 0.35}
+
+# 추정 오차를 흡수하기 위한 여유분
+SAFETY_MARGIN = 0.9
+
+_HANGUL = re.compile(r'[\uAC00-\uD7A3\u1100-\u11FF\u3130-\u318F]')
+_CJK = re.compile(r'[\u3040-\u30FF\u4E00-\u9FFF]')
+
+
+def get_template(name, version=None):
+    """이름과 버전으로 템플릿을 찾습니다. 버전이 없으면 환경변수/기본값 사용."""
+    if version is None:
+        env_key = f'PROMPT_{name.upper()}_VERSION'
+        version = os.environ.get(env_key, DEFAULT_VERSIONS.get(name))
+    try:
+        return version, PROMPT_TEMPLATES[(name, version)]
+    except KeyError:
+        raise KeyError(f'unknown prompt template: {name}@{version}')
+
+
+def _token_ratio(model):
+    family = (model or '').split(':')[0].lower()
+    for prefix, ratio in MODEL_TOKEN_RATIOS.items():
+        if family.startswith(prefix):
+            return ratio
+    return DEFAULT_TOKEN_RATIO
+
+
+def estimate_tokens(text, model=None):
+    """모델 계열별 비율로 텍스트의 토큰 수를 추정합니다."""
+    if not text:
+        return 0
+    ratio = _token_ratio(model)
+    hangul = len(_HANGUL.findall(text))
+    cjk = len(_CJK.findall(text))
+    other = len(text) - hangul - cjk
+    return int(hangul * ratio['hangul'] + cjk * ratio['cjk'] + other * ratio['other']) + 1
+
+
+def fit_text(text, budget, model=None):
+    """추정 토큰 수가 budget 이하가 되도록 본문을 자릅니다.
+
+    가능하면 문단/문장 경계에서 자르고, 예산이 충분하면 원문을 그대로 돌려줍니다.
+    """
+    if budget <= 0 or not text:
+        return ''
+    if estimate_tokens(text, model) <= budget:
+        return text
+
+    # 들어가는 최대 길이를 이분 탐색
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid], model) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+
+    # 마지막 문단/문장 경계로 되돌리되 너무 많이 버리지는 않음
+    for sep in ('\n\n', '\n', '. ', '다. ', '? ', '! '):
+        idx = cut.rfind(sep)
+        if idx >= lo * 0.8:
+            return cut[:idx + len(sep)].rstrip()
+    return cut
+
+
+def build_prompt(name, text, model=None, num_ctx=None, version=None, **params):
+    """템플릿에 본문을 채워 Ollama 요청에 쓸 프롬프트를 만듭니다.
+
+    params는 지시문의 {자리표시자}를 채웁니다. (예: quiz_bank의 count, 출력 예약분도 count에 비례)
+    반환값: {'system', 'prompt', 'version', 'prompt_tokens', 'reserve_tokens', 'text_chars', 'truncated'}
+    reserve_tokens는 출력 토큰 상한으로 Ollama num_predict에 넘길 것 (넘지 않아야 컨텍스트가 넘치지 않음)
+    """
+    version, tpl = get_template(name, version)
+    num_ctx = num_ctx or DEFAULT_NUM_CTX
+    reserve = tpl['reserve_tokens'] + tpl.get('reserve_tokens_per_item', 0) * params.get('count', 0)
+
+    head = f"{tpl['instructions'].format(**params)}\n\n글:\n"
+    tail = f"\n\n{tpl['suffix']}"
+    fixed_tokens = (
+        estimate_tokens(tpl['system'], model)
+        + estimate_tokens(head, model)
+        + estimate_tokens(tail, model)
+    )
+    budget = int((num_ctx - reserve) * SAFETY_MARGIN) - fixed_tokens
+    body = fit_text(text or '', budget, model)
+
+    return {
+        'system': tpl['system'],
+        'prompt': f'{head}{body}{tail}',
+        'version': f'{name}@{version}',
+        'prompt_tokens': fixed_tokens + estimate_tokens(body, model),
+        'reserve_tokens': reserve,
+        'text_chars': len(body),
+        'truncated': len(body) < len(text or ''),
+    }
@@ -0,0 +1,111 @@
+"""퀴즈 뱅크: 글마다 한 번 큰 문제 풀을 만들어 두고 요청마다 일부만 골라 냅니다.
+
+- parse_bank_response(): 'N. 문장 | O/X | 상/중/하 | 해설' 형식의 LLM 응답을 검증하며 파싱
+- dedupe_questions(): 글자 bigram 자카드 유사도로 거의 같은 문제를 제거
+- sample_quiz(): 무작위 또는 난이도 균형(하/중/상 번갈아) 부분집합 선택
+
+한 번의 생성 비용을 여러 퀴즈 세션이 나눠 쓰므로 "다른 문제 풀기"가 LLM을 다시 부르지 않습니다.
+"""
+import os
+import random
+import re
+
+QUIZ_BANK_SIZE = int(os.environ.get('QUIZ_BANK_SIZE', 12))
+QUIZ_BANK_SIMILARITY = float(os.environ.get('QUIZ_BANK_SIMILARITY', 0.7))
+SAMPLE_MODES = ('random', 'balanced')
+
+# 난이도 표기 → 1(쉬움) ~ 3(어려움)
+DIFFICULTY_LEVELS = {
+    '하': 1, '낮음': 1, '쉬움': 1,
+    '중': 2, '중간': 2, '보통': 2,
+    '상': 3, '높음': 3, '어려움': 3,
+}
+IMPORTANCE_BY_DIFFICULTY = {1: '낮음', 2: '중간', 3: '높음'}
+
+_ITEM = re.compile(
+    r'^\s*\d+[.)]\s*(?P<question>[^|\n]+)\|\s*(?P<answer>O|X|true|false)\s*'
+    r'(?:\|\s*(?P<difficulty>[^|\n]+?)\s*)?(?:\|\s*(?P<explanation>[^\n]+))?$',
+    re.IGNORECASE | re.MULTILINE,
+)
+_FOREIGN = re.compile(r'[一-鿿぀-ゟ゠-ヿ]')
+_NON_WORD = re.compile(r'[^0-9a-z가-힣]+')
+
+
+def parse_bank_response(text):
+    """LLM 응답에서 유효한 문제만 뽑아 [{'question', 'answer', 'difficulty', 'importance', 'explanation'}]로 반환"""
+    items = []
+    for m in _ITEM.finditer(text or ''):
+        question = m.group('question').strip()
+        label = (m.group('difficulty') or '').strip().strip('[]()')
+        explanation = (m.group('explanation') or '').strip()
+        if label not in DIFFICULTY_LEVELS and not explanation:
+            # 난이도 없이 'N. 문장 | O | 해설'로 답한 경우
+            label, explanation = '', label
+        explanation = explanation or '본문의 내용을 참고하세요.'
+        # 플레이스홀더, 중국어/일본어 섞인 문제, 너무 짧은 문제 제외
+        if '문장내용' in question or '해설내용' in explanation or '[' in question:
+            continue
+        if _FOREIGN.search(question) or _FOREIGN.search(explanation):
+            continue
+        if len(question) <= 5:
+            continue
+        difficulty = DIFFICULTY_LEVELS.get(label, 2)
+        items.append({
+            'question': question,
+            'answer': m.group('answer').upper() in ('O', 'TRUE'),
+            'difficulty': difficulty,
+            'importance': IMPORTANCE_BY_DIFFICULTY[difficulty],
+            'explanation': explanation,
+        })
+    return items
+
+
+def _bigrams(text):
+    text = _NON_WORD.sub('', text.lower())
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def question_similarity(a, b):
+    """두 문제 문장의 글자 bigram 자카드 유사도 (0.0 ~ 1.0)"""
+    x, y = _bigrams(a), _bigrams(b)
+    return len(x & y) / len(x | y)
+
+
+def dedupe_questions(items, threshold=QUIZ_BANK_SIMILARITY):
+    """앞에서부터 보며 이미 고른 문제와 threshold 이상 비슷한 문제를 버립니다."""
+    kept, grams = [], []
+    for item in items:
+        g = _bigrams(item['question'])
+        if any(len(g & other) / len(g | other) >= threshold for other in grams):
+            continue
+        kept.append(item)
+        grams.append(g)
+    return kept
+
+
+def sample_quiz(bank, count=5, mode='balanced', seed=None):
+    """뱅크에서 count개를 고릅니다. seed를 주면 같은 결과가 나옵니다.
+
+    balanced: 난이도 1→2→3 순으로 돌아가며 하나씩 뽑고, 모자라면 남은 문제로 채움
+    random: 난이도와 관계없이 무작위
+    """
+    if mode not in SAMPLE_MODES:
+        raise ValueError(f'unknown quiz mode: {mode} (choose from {", ".join(SAMPLE_MODES)})')
+    rng = random.Random(seed)
+    count = min(count, len(bank))
+    if mode == 'random':
+        return rng.sample(bank, count)
+
+    by_level = {}
+    for item in bank:
+        by_level.setdefault(item['difficulty'], []).append(item)
+    for items in by_level.values():
+        rng.shuffle(items)
+    picked = []
+    levels = sorted(by_level)
+    while len(picked) < count:
+        for level in levels:
+            if by_level[level] and len(picked) < count:
+                picked.append(by_level[level].pop())
+    rng.shuffle(picked)
+    return picked
@@ -0,0 +1,137 @@
+"""LLM이 한가할 때만 돌리는 낮은 우선순위(추측) 작업 큐.
+
+/process 요약이 끝나면 같은 본문으로 퀴즈를 미리 만들어 두어, 이어지는 /quiz 요청이
+가져오기·추출·생성 없이 저장된 결과로 바로 응답하게 합니다.
+
+- 사용자 요청이 처리 중(is_busy)이면 시작하지 않고, max_wait 동안 기다려도 한가해지지
+  않으면 버립니다. 대기 작업이 max_pending을 넘으면 가장 오래된 것부터 버립니다.
+- 실행 중에도 사용자 요청이 들어오면 작업에 넘긴 cancel()이 True가 되어 생성을 중단합니다.
+  단, 사용자가 바로 그 결과를 기다리는 중(join)이면 끝까지 실행합니다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+SPECULATIVE_MAX_PENDING = int(os.environ.get('SPECULATIVE_MAX_PENDING', 20))
+SPECULATIVE_MAX_WAIT = float(os.environ.get('SPECULATIVE_MAX_WAIT', 600))
+
+
+class GenerationCancelled(Exception):
+    """추측 실행 중 사용자 요청이 들어와 생성을 중단함"""
+
+
+class SpeculativeRunner:
+    """key별로 하나씩만 대기/실행하는 백그라운드 작업 큐
+
+    submit(key, func): func(cancel)을 한가할 때 실행하도록 예약
+    join(key, timeout): 사용자 요청이 같은 작업을 필요로 할 때 호출.
+        대기 중이면 취소(사용자 요청이 직접 처리), 실행 중이면 끝날 때까지 기다림
+    """
+
+    def __init__(self, is_busy, max_pending=SPECULATIVE_MAX_PENDING, max_wait=SPECULATIVE_MAX_WAIT,
+                 idle_check=0.5):
+        self.is_busy = is_busy
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self.idle_check = idle_check
+        self.stats = {'submitted': 0, 'completed': 0, 'cancelled': 0, 'dropped': 0, 'failed': 0, 'joined': 0}
+        self._pending = OrderedDict()
+        self._running = None
+        self._awaited = set()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    def submit(self, key, func):
+        with self._cond:
+            if key in self._pending or key == self._running:
+                return False
+            if len(self._pending) >= self.max_pending:
+                old, _ = self._pending.popitem(last=False)
+                self.stats['dropped'] += 1
+                print(f'Speculative queue full, dropping {old}')
+            self._pending[key] = (func, time.monotonic())
+            self.stats['submitted'] += 1
+            self._cond.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='speculative', daemon=True)
+                self._thread.start()
+        return True
+
+    def join(self, key, timeout=None):
+        """반환값: 실행 중이던 작업이 끝났으면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._pending.pop(key, None) is not None:
+                self.stats['cancelled'] += 1
+                return False
+            if key != self._running:
+                return False
+            self._awaited.add(key)
+            self.stats['joined'] += 1
+            while key == self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def active(self):
+        return self._running is not None
+
+    def pending(self):
+        with self._cond:
+            return list(self._pending)
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    def _should_cancel(self):
+        with self._cond:
+            awaited = self._running in self._awaited
+        return not awaited and self.is_busy()
+
+    def _next(self):
+        """한가해질 때까지 기다렸다가 다음 작업을 꺼냅니다. 멈추면 None."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return None
+                key, (func, queued_at) = next(iter(self._pending.items()))
+                if not self.is_busy():
+                    del self._pending[key]
+                    self._running = key
+                    return key, func
+                if time.monotonic() - queued_at > self.max_wait:
+                    del self._pending[key]
+                    self.stats['dropped'] += 1
+                    print(f'Server busy for {self.max_wait:.0f}s, dropping speculative {key}')
+                    continue
+                self._cond.wait(self.idle_check)
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            key, func = item
+            print(f'Speculative start: {key}')
+            try:
+                func(self._should_cancel)
+                self.stats['completed'] += 1
+            except GenerationCancelled:
+                self.stats['cancelled'] += 1
+                print(f'Speculative cancelled under load: {key}')
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f'Speculative failed for {key}: {e}')
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._awaited.discard(key)
+                    self._cond.notify_all()
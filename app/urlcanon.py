@@ -0,0 +1,117 @@
+"""URL 정규화와 캐시 키 생성.
+
+같은 글이 utm_* 파라미터, 모바일 서브도메인(m.blog...), 끝 슬래시, 리다이렉트 등으로
+다른 URL이 되는 것을 막기 위해 모든 캐시/중복 제거는 canonicalize_url()의 결과를
+키로 사용합니다.
+"""
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+
+from youtube import is_youtube_url, video_id
+
+# 제거할 추적용 쿼리 파라미터
+# ('ref'는 GitHub 브랜치 등 내용을 바꾸는 값으로도 쓰여 제거하지 않음)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref_src', 'referrer', 'spm', 'trk',
+    '_ga', '_gl', 'ncid', 'cmpid',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hmb_', 'vero_')
+
+# 모바일 전용 서브도메인 (m.blog.naver.com → blog.naver.com)
+MOBILE_PREFIXES = ('m.', 'mobile.', 'amp.')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# tistory 모바일 경로: /m/123 → /123
+_TISTORY_MOBILE_PATH = re.compile(r'^/m(/|$)')
+
+
+def _is_tracking(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url):
+    """URL을 정규 형태로 바꿉니다.
+
+    - 스킴/호스트 소문자화, 기본 포트와 www./모바일 서브도메인 제거
+    - 추적용 쿼리 파라미터 제거, 나머지 파라미터 정렬
+    - 프래그먼트 제거, 빈 경로는 '/', 그 외 끝 슬래시 제거
+    """
+    if not url:
+        return url
+    url = url.strip()
+    if '://' not in url:
+        url = f'http://{url}'
+    if is_youtube_url(url):
+        # youtu.be/ID, shorts/ID, watch?v=ID&t=30 등은 모두 같은 영상
+        return f'https://youtube.com/watch?v={video_id(url)}'
+    parts = urlsplit(url)
+
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        # 대부분의 사이트가 https로 리다이렉트하므로 같은 키로 취급
+        scheme = 'https'
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    for prefix in MOBILE_PREFIXES:
+        # 'm.example.com' 처럼 등록 도메인 자체가 되는 경우는 건드리지 않음
+        if host.startswith(prefix) and host.count('.') >= 2:
+            host = host[len(prefix):]
+            break
+
+    port = parts.port
+    netloc = host if not port or port == DEFAULT_PORTS.get(parts.scheme.lower()) else f'{host}:{port}'
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if host.endswith('tistory.com'):
+        path = _TISTORY_MOBILE_PATH.sub('/', path) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def canonical_key(url):
+    """캐시 파일명 등에 쓸 수 있는 고정 길이 키 (정규 URL의 SHA-1)"""
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+
+def same_host(a, b):
+    """두 URL이 정규화 후 같은 호스트인지 (www./모바일 서브도메인 차이는 무시)"""
+    return urlsplit(canonicalize_url(a)).netloc == urlsplit(canonicalize_url(b)).netloc
+
+
+def resolve_canonical(requested_url, final_url=None, link_canonical=None):
+    """요청 URL, 리다이렉트 후 최종 URL, <link rel=canonical> 중 대표 URL을 고릅니다.
+
+    우선순위: 페이지가 선언한 canonical > 최종 URL > 요청 URL
+    페이지가 선언한 canonical은 가져온 URL과 같은 호스트일 때만 믿습니다.
+    (다른 사이트 주소를 선언해 그 사이트의 캐시 항목을 덮어쓰는 것을 막기 위함)
+    """
+    base = final_url or requested_url
+    if link_canonical:
+        absolute = urljoin(base, link_canonical.strip())
+        if urlsplit(absolute).scheme in ('http', 'https'):
+            if same_host(absolute, base):
+                return canonicalize_url(absolute)
+            print(f'Ignoring cross-host canonical {absolute} for {base}')
+    return canonicalize_url(base)
+
+
+def url_aliases(requested_url, final_url=None, canonical_url=None):
+    """같은 글을 가리키는 정규화된 URL 목록 (중복 제거, 순서 유지)"""
+    aliases = []
+    for u in (requested_url, final_url, canonical_url):
+        if u:
+            c = canonicalize_url(u)
+            if c not in aliases:
+                aliases.append(c)
+    return aliases
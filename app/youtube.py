@@ -0,0 +1,194 @@
+"""YouTube 영상의 자막만 가져와 요약/퀴즈용 본문으로 바꿉니다.
+
+yt-dlp로 메타데이터만 조회하고(영상 다운로드 없음) 자막 트랙 URL에서
+json3 또는 vtt 자막을 직접 받아 타임스탬프 단위 문단으로 묶습니다.
+요청당 전송량은 자막 크기(수 KB~수백 KB) 수준이며, 결과는 영상 id별로 캐시합니다.
+"""
+import json
+import os
+import re
+import tempfile
+from urllib.parse import urlsplit, parse_qs
+
+import http_pool
+from config import CACHE_DIR
+
+YOUTUBE_CACHE_DIR = os.path.join(CACHE_DIR, 'youtube')
+# 자막 언어 우선순위
+SUB_LANGS = [lang.strip() for lang in os.environ.get('YOUTUBE_SUB_LANGS', 'ko,en').split(',') if lang.strip()]
+# 한 문단으로 묶을 자막 구간 길이 (초)
+CHUNK_SECONDS = int(os.environ.get('YOUTUBE_CHUNK_SECONDS', 60))
+
+YOUTUBE_HOSTS = ('youtube.com', 'youtu.be', 'youtube-nocookie.com')
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_VTT_TIME = re.compile(r'(?:(\d+):)?(\d{2}):(\d{2})[.,](\d{3})\s+-->')
+_TAG = re.compile(r'<[^>]+>')
+
+
+class TranscriptUnavailable(ValueError):
+    """영상에 쓸 수 있는 자막이 없음 (서버는 422로 응답)"""
+
+
+def _host(url):
+    host = (urlsplit(url).hostname or '').lower()
+    for prefix in ('www.', 'm.', 'music.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def is_youtube_url(url):
+    return _host(url or '') in YOUTUBE_HOSTS and video_id(url) is not None
+
+
+def video_id(url):
+    """watch?v=, youtu.be/, shorts/, embed/, live/ 형태에서 영상 id를 꺼냅니다."""
+    parts = urlsplit(url)
+    host = _host(url)
+    candidate = None
+    if host == 'youtu.be':
+        candidate = parts.path.strip('/').split('/')[0]
+    elif host in YOUTUBE_HOSTS:
+        if parts.path == '/watch':
+            candidate = (parse_qs(parts.query).get('v') or [None])[0]
+        else:
+            segments = parts.path.strip('/').split('/')
+            if len(segments) >= 2 and segments[0] in ('shorts', 'embed', 'live', 'v'):
+                candidate = segments[1]
+    return candidate if candidate and _VIDEO_ID.match(candidate) else None
+
+
+def _format_ts(seconds):
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f'{h}:{m:02d}:{s:02d}' if h else f'{m:02d}:{s:02d}'
+
+
+def parse_vtt(content):
+    """WebVTT 자막을 [(시작 초, 텍스트)] 로 변환합니다. 자동 자막의 반복 줄은 제거."""
+    cues = []
+    start = None
+    last_line = None
+    for line in content.splitlines():
+        m = _VTT_TIME.match(line.strip())
+        if m:
+            h, mnt, sec, ms = m.groups()
+            start = int(h or 0) * 3600 + int(mnt) * 60 + int(sec) + int(ms) / 1000
+            continue
+        if start is None:
+            continue
+        text = _TAG.sub('', line).strip()
+        if not text:
+            continue
+        # 자동 자막은 직전 줄을 다음 큐에서 반복하므로 건너뜀
+        if text == last_line:
+            continue
+        cues.append((start, text))
+        last_line = text
+    return cues
+
+
+def parse_json3(content):
+    """YouTube json3 자막을 [(시작 초, 텍스트)] 로 변환합니다."""
+    data = json.loads(content)
+    cues = []
+    for event in data.get('events', []):
+        segs = event.get('segs')
+        if not segs:
+            continue
+        text = ''.join(seg.get('utf8', '') for seg in segs).replace('\n', ' ').strip()
+        if text:
+            cues.append((event.get('tStartMs', 0) / 1000, text))
+    return cues
+
+
+def chunk_cues(cues, chunk_seconds=CHUNK_SECONDS):
+    """자막 큐를 chunk_seconds 단위 문단으로 묶고 '[mm:ss]' 타임스탬프를 붙입니다.
+
+    문단은 빈 줄로 구분되므로 프롬프트 예산에 맞춰 자를 때 구간 경계에서 잘립니다.
+    """
+    paragraphs = []
+    current, current_start = [], None
+    for start, text in cues:
+        if current_start is None:
+            current_start = start
+        elif start - current_start >= chunk_seconds:
+            paragraphs.append(f'[{_format_ts(current_start)}] ' + ' '.join(current))
+            current, current_start = [], start
+        current.append(text)
+    if current:
+        paragraphs.append(f'[{_format_ts(current_start)}] ' + ' '.join(current))
+    return '\n\n'.join(paragraphs)
+
+
+def _pick_track(info, langs=None):
+    """수동 자막 > 자동 자막 순으로, 언어 우선순위에 맞는 (언어, 형식, URL)을 고릅니다."""
+    langs = langs or SUB_LANGS
+    for source in ('subtitles', 'automatic_captions'):
+        tracks = info.get(source) or {}
+        for lang in langs:
+            # 'ko', 'ko-KR' 등 지역 코드 변형까지 허용
+            for key in [lang] + [k for k in tracks if k.startswith(f'{lang}-')]:
+                formats = tracks.get(key) or []
+                by_ext = {f.get('ext'): f.get('url') for f in formats}
+                for ext in ('json3', 'vtt'):
+                    if by_ext.get(ext):
+                        return key, ext, by_ext[ext]
+    return None
+
+
+def _cache_path(vid):
+    return os.path.join(YOUTUBE_CACHE_DIR, f'{vid}.json')
+
+
+def fetch_transcript(url, timeout=10):
+    """YouTube URL의 자막을 {'title', 'text', 'canonical_url', 'final_url', 'lang'} 형태로 반환합니다.
+
+    자막이 없으면 TranscriptUnavailable(ValueError)을 발생시킵니다.
+    """
+    vid = video_id(url)
+    if not vid:
+        raise ValueError(f'not a YouTube video URL: {url}')
+    canonical = f'https://www.youtube.com/watch?v={vid}'
+
+    path = _cache_path(vid)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            print(f'YouTube transcript cache hit: {vid}')
+            return json.load(f)
+
+    # yt-dlp는 import 비용이 커서 유튜브 요청이 있을 때만 불러옴
+    import yt_dlp
+
+    opts = {'skip_download': True, 'quiet': True, 'no_warnings': True, 'socket_timeout': timeout}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(canonical, download=False)
+
+    track = _pick_track(info)
+    if not track:
+        raise TranscriptUnavailable(f'no subtitles available for {canonical} (langs: {SUB_LANGS})')
+    lang, ext, sub_url = track
+    print(f'Fetching {ext} subtitles ({lang}) for {vid}')
+    resp = http_pool.get(sub_url, timeout=timeout, respect_robots=False)
+    resp.raise_for_status()
+    cues = parse_json3(resp.text) if ext == 'json3' else parse_vtt(resp.text)
+
+    result = {
+        'title': info.get('title') or '',
+        'text': chunk_cues(cues),
+        'canonical_url': canonical,
+        'final_url': canonical,
+        'lang': lang,
+    }
+    os.makedirs(YOUTUBE_CACHE_DIR, exist_ok=True)
+    # 같은 영상을 동시에 요청해도 서로의 임시 파일을 덮어쓰지 않도록 요청마다 고유한 임시 파일 사용
+    fd, tmp = tempfile.mkstemp(dir=YOUTUBE_CACHE_DIR, prefix=f'.{vid}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return result
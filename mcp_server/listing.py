@@ -0,0 +1,131 @@
+"""DATA_DIR 파일 목록의 메모리 인덱스.
+
+시작 시 os.scandir()로 한 번 읽어 이름순으로 정렬된 목록과 크기/수정시각을 유지하고,
+업로드할 때마다 갱신합니다. 목록 요청은 디렉터리를 다시 읽지 않고 인덱스에서
+커서 기반으로 잘라서 돌려줍니다. 서버 밖에서 파일이 바뀐 경우는 디렉터리 mtime으로
+감지해 다시 스캔합니다.
+"""
+import base64
+import bisect
+import os
+import threading
+import uuid
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(name):
+    return base64.urlsafe_b64encode(name.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+
+
+class FileIndex:
+    def __init__(self, root, ignore_prefix='.'):
+        self.root = root
+        self.ignore_prefix = ignore_prefix
+        self._lock = threading.Lock()
+        # 재시작 후에도 ETag가 겹치지 않도록 부팅마다 다른 값 사용
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._counter = 0
+        self._names = []
+        self._meta = {}
+        self._dir_mtime = None
+        self.rescan()
+
+    @property
+    def version(self):
+        return f'{self._boot_id}-{self._counter}'
+
+    def _dir_stat(self):
+        try:
+            return os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def rescan(self):
+        meta = {}
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.startswith(self.ignore_prefix) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                meta[entry.name] = {'size': st.st_size, 'mtime': st.st_mtime}
+        with self._lock:
+            self._meta = meta
+            self._names = sorted(meta)
+            self._dir_mtime = self._dir_stat()
+            self._counter += 1
+
+    def refresh_if_changed(self):
+        """서버 밖에서 디렉터리가 바뀌었으면 다시 스캔하고 True를 반환합니다."""
+        if self._dir_stat() != self._dir_mtime:
+            self.rescan()
+            return True
+        return False
+
+    def update(self, name, sha256=None):
+        """파일을 쓴 직후 호출하여 인덱스에 반영합니다. sha256은 ETag용 체크섬."""
+        st = os.stat(os.path.join(self.root, name))
+        with self._lock:
+            if name not in self._meta:
+                bisect.insort(self._names, name)
+            self._meta[name] = {'size': st.st_size, 'mtime': st.st_mtime, 'sha256': sha256}
+            self._dir_mtime = self._dir_stat()
+            self._counter += 1
+
+    def remove(self, name):
+        with self._lock:
+            if self._meta.pop(name, None) is not None:
+                idx = bisect.bisect_left(self._names, name)
+                del self._names[idx]
+            self._dir_mtime = self._dir_stat()
+            self._counter += 1
+
+    def get(self, name):
+        return self._meta.get(name)
+
+    def snapshot(self):
+        """{name: {'size', 'mtime', ...}} 복사본"""
+        with self._lock:
+            return dict(self._meta)
+
+    def list(self, cursor=None, limit=DEFAULT_LIMIT, prefix=None,
+             modified_after=None, modified_before=None):
+        """이름순으로 limit개를 돌려줍니다. 반환값: (files, next_cursor)"""
+        limit = max(1, min(limit, MAX_LIMIT))
+        with self._lock:
+            names, meta = self._names, self._meta
+            if cursor:
+                start = bisect.bisect_right(names, decode_cursor(cursor))
+            elif prefix:
+                start = bisect.bisect_left(names, prefix)
+            else:
+                start = 0
+
+            files = []
+            last = None
+            for i in range(start, len(names)):
+                name = names[i]
+                if prefix and not name.startswith(prefix):
+                    if name > prefix:
+                        break
+                    continue
+                info = meta[name]
+                last = name
+                if modified_after is not None and info['mtime'] <= modified_after:
+                    continue
+                if modified_before is not None and info['mtime'] >= modified_before:
+                    continue
+                files.append({'name': name, 'size': info['size'], 'mtime': info['mtime']})
+                if len(files) >= limit:
+                    break
+            else:
+                last = None
+
+        next_cursor = encode_cursor(last) if last and len(files) >= limit else None
+        return files, next_cursor
@@ -0,0 +1,150 @@
+"""저장된 요약/퀴즈 마크다운에 대한 전문 검색 인덱스 (SQLite FTS5).
+
+한국어는 띄어쓰기/조사 때문에 단어 단위 색인이 잘 맞지 않으므로 한글·한자·가나는
+문자 2-gram으로, 영문/숫자는 소문자 단어로 쪼갠 토큰열을 FTS5에 넣고 bm25로
+순위를 매깁니다. 업로드될 때마다 해당 파일만 다시 색인하고, 시작 시에는
+(mtime, size)가 바뀐 파일만 따라잡습니다.
+"""
+import os
+import re
+import sqlite3
+import threading
+
+# 색인할 파일 확장자와 파일당 최대 읽기 크기
+INDEXED_EXTENSIONS = ('.md', '.txt', '.json')
+MAX_INDEX_BYTES = int(os.environ.get('SEARCH_MAX_INDEX_BYTES', 1024 * 1024))
+SNIPPET_CHARS = 160
+
+_TOKEN = re.compile(r'[\uAC00-\uD7A3]+|[\u3040-\u30FF\u4E00-\u9FFF]+|[a-z0-9]+')
+
+
+def tokenize(text):
+    """한글/CJK 연속 구간은 2-gram, 영문/숫자는 단어 단위 토큰 목록"""
+    tokens = []
+    for run in _TOKEN.findall((text or '').lower()):
+        if run[0].isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _title_of(content):
+    for line in content.splitlines():
+        if line.startswith('# '):
+            return line[2:].strip()
+    return ''
+
+
+def _snippet(content, query):
+    """질의 단어가 처음 나오는 위치 주변을 잘라 보여줍니다."""
+    lowered = content.lower()
+    pos = -1
+    for term in query.lower().split():
+        pos = lowered.find(term)
+        if pos >= 0:
+            break
+    start = max(0, pos - SNIPPET_CHARS // 4) if pos >= 0 else 0
+    snippet = ' '.join(content[start:start + SNIPPET_CHARS].split())
+    return ('…' if start else '') + snippet
+
+
+class SearchIndex:
+    def __init__(self, root, db_path=None):
+        self.root = root
+        # DATA_DIR 바로 아래에 저널 파일이 생기고 지워지면 디렉터리 mtime이 바뀌어
+        # 목록 인덱스가 매번 재스캔되므로 하위 디렉터리에 둠
+        self.db_path = db_path or os.path.join(root, '.index', 'search.db')
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+                    name UNINDEXED, title, body, tokenize='unicode61'
+                )""")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS doc_state (
+                    name TEXT PRIMARY KEY,
+                    mtime REAL,
+                    size INTEGER
+                )""")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def is_indexable(name):
+        return name.lower().endswith(INDEXED_EXTENSIONS)
+
+    def index_file(self, name):
+        """파일 하나를 (다시) 색인합니다. 색인 대상이 아니면 False."""
+        if not self.is_indexable(name):
+            return False
+        path = os.path.join(self.root, name)
+        st = os.stat(path)
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read(MAX_INDEX_BYTES)
+        title = _title_of(content)
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM docs WHERE name = ?', (name,))
+            conn.execute(
+                'INSERT INTO docs (name, title, body) VALUES (?, ?, ?)',
+                (name, ' '.join(tokenize(title)), ' '.join(tokenize(content))),
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO doc_state (name, mtime, size) VALUES (?, ?, ?)',
+                (name, st.st_mtime, st.st_size),
+            )
+        return True
+
+    def remove(self, name):
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM docs WHERE name = ?', (name,))
+            conn.execute('DELETE FROM doc_state WHERE name = ?', (name,))
+
+    def sync(self, files):
+        """{name: {'size', 'mtime'}} 와 비교하여 바뀐 파일만 색인하고 사라진 파일은 지웁니다."""
+        with self._connect() as conn:
+            state = {row[0]: (row[1], row[2]) for row in conn.execute('SELECT name, mtime, size FROM doc_state')}
+        indexed = 0
+        for name, info in files.items():
+            if self.is_indexable(name) and state.get(name) != (info['mtime'], info['size']):
+                try:
+                    self.index_file(name)
+                    indexed += 1
+                except OSError:
+                    continue
+        for name in set(state) - set(files):
+            self.remove(name)
+        return indexed
+
+    def search(self, query, limit=20, offset=0):
+        """bm25 순위(제목 가중치 2배)로 검색합니다. 반환값: [{'name', 'title', 'score', 'snippet'}]"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # 한 글자 한글 질의는 그 글자로 시작하는 2-gram과 접두 일치
+        match = ' AND '.join(f'"{t}"*' if len(t) == 1 and not t.isascii() else f'"{t}"' for t in tokens)
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT name, bm25(docs, 0.0, 2.0, 1.0) AS score FROM docs '
+                'WHERE docs MATCH ? ORDER BY score LIMIT ? OFFSET ?',
+                (match, limit, offset),
+            ).fetchall()
+
+        results = []
+        for name, score in rows:
+            try:
+                with open(os.path.join(self.root, name), 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read(MAX_INDEX_BYTES)
+            except OSError:
+                continue
+            results.append({
+                'name': name,
+                'title': _title_of(content),
+                # bm25는 작을수록 관련도가 높으므로 부호를 바꿔서 반환
+                'score': round(-score, 4),
+                'snippet': _snippet(content, query),
+            })
+        return results
@@ -1,27 +1,216 @@
 import os
+import gzip
+import io
+import json
+import hashlib
+import tempfile
+import time
 from flask import Flask, request, jsonify, send_from_directory, abort
 from werkzeug.utils import secure_filename
+from listing import FileIndex, DEFAULT_LIMIT
+from search_index import SearchIndex
 
 app = Flask(__name__)
+# 앞단 프록시(nginx 등)가 X-Sendfile을 처리하면 파일 전송을 프록시에 맡김
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE', '0') == '1'
 DATA_DIR = os.environ.get('DATA_DIR', '/data')
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 압축 해제 후 배치 요청 본문의 최대 크기 (gzip bomb 방지)
+MAX_BATCH_BYTES = int(os.environ.get('MAX_BATCH_BYTES', 50 * 1024 * 1024))
+TMP_PREFIX = '.tmp-'
+# 업로드 중인 임시 파일은 하위 디렉터리에 둠 (같은 파일시스템이라 rename은 그대로 원자적).
+# DATA_DIR에 만들면 디렉터리 mtime이 바뀌어 목록/검색 요청마다 전체 재스캔이 일어남
+TMP_DIRNAME = '.tmp'
+CHUNK_SIZE = 64 * 1024
+# 스트리밍 업로드 최대 크기
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 1024 * 1024 * 1024))
+# mkstemp는 0600으로 만들므로 rename 전에 open()으로 만든 파일과 같은 권한(0666 & ~umask)으로 맞춤
+# (umask는 읽으려면 바꿔야 해서 스레드가 뜨기 전인 import 시점에 한 번만 읽음)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+file_index = FileIndex(DATA_DIR)
+search_index = SearchIndex(DATA_DIR, os.environ.get('SEARCH_DB'))
+# 서버가 꺼져 있던 동안 바뀐 파일만 색인
+search_index.sync(file_index.snapshot())
+
+class ChecksumMismatch(ValueError):
+    pass
+
+class UploadTooLarge(ValueError):
+    pass
+
+def _atomic_write_stream(path, stream, expected_sha256=None, max_bytes=None):
+    """스트림을 청크 단위로 임시 파일에 쓰고 SHA-256을 검증한 뒤 rename 합니다.
+
+    읽는 쪽이 반쯤 쓰인 파일을 보지 않으며, 본문 전체를 메모리에 올리지 않습니다.
+    반환값: (sha256 hex, 크기)
+    """
+    tmp_dir = os.path.join(os.path.dirname(path), TMP_DIRNAME)
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir, prefix=TMP_PREFIX)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(f'upload exceeds {max_bytes} bytes')
+                digest.update(chunk)
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        checksum = digest.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != checksum:
+            raise ChecksumMismatch(f'sha256 mismatch: expected {expected_sha256}, got {checksum}')
+        os.chmod(tmp, FILE_MODE)
+        os.replace(tmp, path)
+        return checksum, size
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _atomic_write(path, content):
+    """문자열 내용을 원자적으로 저장합니다. 반환값: sha256 hex"""
+    checksum, _ = _atomic_write_stream(path, io.BytesIO(content.encode('utf-8')))
+    return checksum
+
+def _refresh_indexes():
+    """서버 밖에서 DATA_DIR이 바뀌었으면 목록/검색 인덱스를 따라잡습니다."""
+    if file_index.refresh_if_changed():
+        search_index.sync(file_index.snapshot())
+
+def _on_file_written(name, checksum):
+    """저장 직후 목록/검색 인덱스를 갱신합니다."""
+    file_index.update(name, sha256=checksum)
+    search_index.index_file(name)
+
+def _file_checksum(name):
+    """강한 ETag로 쓸 파일 SHA-256 (인덱스에 캐시, 파일이 바뀌면 다시 계산)"""
+    path = os.path.join(DATA_DIR, name)
+    st = os.stat(path)
+    meta = file_index.get(name)
+    if meta and meta.get('sha256') and meta['size'] == st.st_size and meta['mtime'] == st.st_mtime:
+        return meta['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    checksum = digest.hexdigest()
+    file_index.update(name, sha256=checksum)
+    return checksum
+
+def _read_json_body():
+    """Content-Encoding: gzip 을 지원하는 JSON 본문 파서"""
+    raw = request.get_data()
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        with gzip.GzipFile(fileobj=io.BytesIO(raw)) as gz:
+            raw = gz.read(MAX_BATCH_BYTES + 1)
+    if len(raw) > MAX_BATCH_BYTES:
+        abort(413)
+    return json.loads(raw.decode('utf-8') or '{}')
+
 @app.route('/health')
 def health():
     return jsonify({'status':'ok'})
 
+def _float_arg(name):
+    value = request.args.get(name)
+    return float(value) if value not in (None, '') else None
+
 @app.route('/files', methods=['GET'])
 def list_files():
-    files = os.listdir(DATA_DIR)
-    return jsonify({'files': files})
+    """파일 목록 (커서 페이지네이션)
+
+    쿼리: cursor, limit(기본 100, 최대 1000), prefix, modified_after, modified_before(epoch 초)
+    응답: {"files": [{"name", "size", "mtime"}], "next_cursor": str|null}
+    """
+    _refresh_indexes()
+    etag = hashlib.md5(f'{file_index.version}?{request.query_string.decode()}'.encode()).hexdigest()
+    if etag in request.if_none_match:
+        return '', 304, {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+    try:
+        files, next_cursor = file_index.list(
+            cursor=request.args.get('cursor'),
+            limit=int(request.args.get('limit', DEFAULT_LIMIT)),
+            prefix=request.args.get('prefix'),
+            modified_after=_float_arg('modified_after'),
+            modified_before=_float_arg('modified_before'),
+        )
+    except ValueError:
+        return jsonify({'error':'invalid query'}), 400
+    resp = jsonify({'files': files, 'next_cursor': next_cursor})
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
 
-@app.route('/files/<path:filename>', methods=['GET'])
+@app.route('/search', methods=['GET'])
+def search():
+    """저장된 파일 전문 검색. 쿼리: q, limit(기본 20, 최대 100), offset"""
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error':'q required'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error':'invalid query'}), 400
+    _refresh_indexes()
+    started = time.perf_counter()
+    results = search_index.search(query, limit=limit, offset=offset)
+    for r in results:
+        meta = file_index.get(r['name']) or {}
+        r['size'] = meta.get('size')
+        r['mtime'] = meta.get('mtime')
+    took_ms = round((time.perf_counter() - started) * 1000, 2)
+    return jsonify({'query': query, 'results': results, 'took_ms': took_ms})
+
+@app.route('/files/<path:filename>', methods=['GET', 'HEAD'])
 def get_file(filename):
+    """파일 다운로드 (강한 ETag, If-None-Match → 304, Range 요청 지원)
+
+    파일 객체는 wsgi.file_wrapper로 넘어가므로 gunicorn 등에서는 sendfile로,
+    USE_X_SENDFILE=1 이면 앞단 프록시가 직접 전송합니다.
+    """
     safe = secure_filename(filename)
     path = os.path.join(DATA_DIR, safe)
-    if not os.path.exists(path):
+    if not safe or not os.path.isfile(path):
         abort(404)
-    return send_from_directory(DATA_DIR, safe)
+    return send_from_directory(DATA_DIR, safe, etag=_file_checksum(safe), conditional=True, max_age=0)
+
+@app.route('/files/<path:filename>', methods=['PUT'])
+def put_file(filename):
+    """요청 본문을 그대로 스트리밍하여 저장합니다.
+
+    X-Content-SHA256 헤더가 있으면 저장 전에 검증하고, 다르면 422를 돌려줍니다.
+    """
+    safe = secure_filename(filename)
+    if not safe:
+        return jsonify({'error':'invalid filename'}), 400
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify({'error':'too large'}), 413
+    try:
+        checksum, size = _atomic_write_stream(
+            os.path.join(DATA_DIR, safe),
+            request.stream,
+            expected_sha256=request.headers.get('X-Content-SHA256'),
+            max_bytes=MAX_UPLOAD_BYTES,
+        )
+    except ChecksumMismatch as e:
+        return jsonify({'error': str(e)}), 422
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    _on_file_written(safe, checksum)
+    resp = jsonify({'saved': safe, 'size': size, 'sha256': checksum})
+    resp.set_etag(checksum)
+    return resp, 201
 
 @app.route('/upload', methods=['POST'])
 def upload():
@@ -32,10 +221,39 @@ def upload():
         return jsonify({'error':'filename and content required'}), 400
     safe = secure_filename(filename)
     path = os.path.join(DATA_DIR, safe)
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    _on_file_written(safe, _atomic_write(path, content))
     return jsonify({'saved': safe}), 201
 
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """여러 파일을 한 번에 저장합니다. 본문: {"files": [{"filename", "content"}, ...]}"""
+    try:
+        payload = _read_json_body()
+    except (OSError, EOFError, ValueError):
+        # EOFError: 중간에 잘린 gzip 본문
+        return jsonify({'error':'invalid body'}), 400
+    files = payload.get('files') if isinstance(payload, dict) else None
+    if not isinstance(files, list):
+        return jsonify({'error':'files required'}), 400
+    # 형식이 틀린 항목이 있으면 아무것도 쓰지 않고 요청 전체를 거절
+    for item in files:
+        if not isinstance(item, dict):
+            return jsonify({'error':'each file must be an object'}), 400
+        for key in ('filename', 'content'):
+            if item.get(key) is not None and not isinstance(item[key], str):
+                return jsonify({'error':f'{key} must be a string'}), 400
+    saved, errors = [], []
+    for item in files:
+        filename = item.get('filename')
+        content = item.get('content')
+        safe = secure_filename(filename or '')
+        if not safe or content is None:
+            errors.append({'filename': filename, 'error': 'filename and content required'})
+            continue
+        _on_file_written(safe, _atomic_write(os.path.join(DATA_DIR, safe), content))
+        saved.append(safe)
+    return jsonify({'saved': saved, 'errors': errors}), 201 if not errors else 207
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 3000))
     app.run(host='0.0.0.0', port=port)
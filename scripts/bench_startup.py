@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""app 모듈 import/기동 시간 측정 및 회귀 감시.
+
+새 인터프리터에서 모듈을 import 하는 데 걸리는 시간을 여러 번 재서 중앙값을 출력하고,
+정적 페이지 경로에서 불러오면 안 되는 무거운 모듈(Selenium 등)이 로드됐는지 확인합니다.
+
+    python scripts/bench_startup.py                 # 측정만
+    python scripts/bench_startup.py --max-ms 800    # 기준 초과 시 종료 코드 1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+APP_DIR = project_root / 'app'
+
+# 첫 사용 시점까지 import 되면 안 되는 모듈
+HEAVY_MODULES = ['selenium', 'webdriver_manager', 'yt_dlp']
+
+TARGETS = {
+    'extract': 'import extract',
+    'bulk': 'import bulk',
+    'main': 'import main',
+}
+
+PROBE = """
+import sys, time, json
+t = time.perf_counter()
+{stmt}
+elapsed = (time.perf_counter() - t) * 1000
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{'import_ms': elapsed, 'heavy': heavy}}))
+"""
+
+
+def measure(stmt, runs):
+    env = dict(os.environ, CACHE_DIR=tempfile.mkdtemp(prefix='bench-cache-'), PYTHONDONTWRITEBYTECODE='1')
+    env.pop('MCP_HOST', None)
+    import_ms, wall_ms, heavy = [], [], []
+    for _ in range(runs):
+        t = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, '-c', PROBE.format(stmt=stmt, heavy=HEAVY_MODULES)],
+            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        wall_ms.append((time.perf_counter() - t) * 1000)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        import_ms.append(result['import_ms'])
+        heavy = result['heavy']
+    return {
+        'import_ms': round(statistics.median(import_ms), 1),
+        'process_ms': round(statistics.median(wall_ms), 1),
+        'heavy_modules': heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='app 모듈 import 시간 측정')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None, help='import 중앙값 허용 상한 (ms)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    args = parser.parse_args()
+
+    results = {name: measure(stmt, args.runs) for name, stmt in TARGETS.items()}
+    failed = False
+    for name, r in results.items():
+        over = args.max_ms is not None and r['import_ms'] > args.max_ms
+        failed = failed or over or bool(r['heavy_modules'])
+        if not args.json:
+            flag = ' !!' if over or r['heavy_modules'] else ''
+            print(f"{name:8s} import {r['import_ms']:7.1f} ms  process {r['process_ms']:7.1f} ms  "
+                  f"heavy={r['heavy_modules']}{flag}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""브라우저 안 추출(dom_extract.js)과 파이썬 추출(extract_page) 결과·속도 비교.
+
+벤치마크 코퍼스의 각 문서를 headless Chrome 한 세션에서 열고, 같은 렌더링 결과에 대해
+1) page_source 전송 + BeautifulSoup 파싱, 2) execute_script(dom_extract.js)를 각각 실행해
+제목 일치 여부, 본문 유사도(줄 단위), 걸린 시간을 비교합니다.
+코퍼스는 extract.py --bulk와 같은 입력(디렉터리, glob, URL 목록, JSONL)을 받습니다.
+
+    python scripts/compare_dom_extract.py bench/pages/
+    python scripts/compare_dom_extract.py urls.txt --min-similarity 0.98 --json
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / 'app'))
+
+from bulk import iter_tasks  # noqa: E402
+from extract import create_driver, extract_in_browser, extract_page  # noqa: E402
+
+
+def text_similarity(a, b):
+    """줄 단위 SequenceMatcher 비율 (1.0이면 완전히 같음)"""
+    if a == b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a.splitlines(), b.splitlines(), autojunk=False).ratio()
+
+
+def _task_location(task, tmpdir):
+    if task.get('url'):
+        return task['url']
+    path = task.get('path')
+    if path is None:
+        path = os.path.join(tmpdir, f"{abs(hash(task['id']))}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(task['html'])
+    return Path(path).resolve().as_uri()
+
+
+def compare_one(driver, location):
+    driver.get(location)
+    url = driver.current_url
+
+    t0 = time.perf_counter()
+    html = driver.page_source
+    t1 = time.perf_counter()
+    py = extract_page(html, url=url)
+    t2 = time.perf_counter()
+    # dom_extract.js는 DOM을 수정하므로 page_source를 받은 뒤에 실행
+    dom = extract_in_browser(driver)
+    t3 = time.perf_counter()
+
+    return {
+        'html_bytes': len(html.encode('utf-8')),
+        'title_match': py['title'] == dom['title'],
+        'canonical_match': py['canonical_url'] == dom['canonical_url'],
+        'similarity': round(text_similarity(py['text'], dom['text']), 4),
+        'python_chars': len(py['text']),
+        'dom_chars': len(dom['text']),
+        'python_ms': round((t2 - t0) * 1000, 1),
+        'source_ms': round((t1 - t0) * 1000, 1),
+        'parse_ms': round((t2 - t1) * 1000, 1),
+        'dom_ms': round((t3 - t2) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='브라우저 안 본문 추출과 파이썬 추출 비교')
+    parser.add_argument('corpus', help='HTML 디렉터리, glob 패턴, URL 목록 파일 또는 JSONL')
+    parser.add_argument('--input-type', choices=['auto', 'dir', 'glob', 'urls', 'jsonl'], default='auto')
+    parser.add_argument('--min-similarity', type=float, default=0.95,
+                        help='이보다 유사도가 낮은 문서가 있으면 종료 코드 1')
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--json', action='store_true', help='문서별 결과를 JSONL로 출력')
+    args = parser.parse_args()
+
+    results = []
+    driver = create_driver(args.timeout)
+    try:
+        with tempfile.TemporaryDirectory(prefix='dom-compare-') as tmpdir:
+            for task in iter_tasks(args.corpus, args.input_type):
+                try:
+                    if task.get('error'):
+                        raise ValueError(task['error'])
+                    result = compare_one(driver, _task_location(task, tmpdir))
+                except Exception as e:
+                    result = {'error': f'{type(e).__name__}: {e}'}
+                result['id'] = task['id']
+                results.append(result)
+                if args.json:
+                    print(json.dumps(result, ensure_ascii=False))
+                elif 'error' in result:
+                    print(f"{result['id']}: {result['error']}")
+                else:
+                    flag = ' !!' if result['similarity'] < args.min_similarity else ''
+                    print(f"{result['similarity']:.3f} title={'Y' if result['title_match'] else 'N'} "
+                          f"py {result['python_ms']:7.1f} ms  dom {result['dom_ms']:7.1f} ms  "
+                          f"{result['html_bytes'] / 1024:8.1f} KB  {result['id']}{flag}")
+    finally:
+        driver.quit()
+
+    ok = [r for r in results if 'error' not in r]
+    failed = [r for r in ok if r['similarity'] < args.min_similarity]
+    if ok:
+        print(
+            f"\n[compare] {len(ok)} docs ({len(results) - len(ok)} errors), "
+            f"mean similarity {statistics.mean(r['similarity'] for r in ok):.3f}, "
+            f"{sum(r['similarity'] == 1.0 for r in ok)} identical, "
+            f"{sum(r['title_match'] for r in ok)} titles match, {len(failed)} below {args.min_similarity}\n"
+            f"[compare] median python {statistics.median(r['python_ms'] for r in ok):.1f} ms "
+            f"(page_source {statistics.median(r['source_ms'] for r in ok):.1f} + "
+            f"parse {statistics.median(r['parse_ms'] for r in ok):.1f}), "
+            f"median dom {statistics.median(r['dom_ms'] for r in ok):.1f} ms",
+            file=sys.stderr,
+        )
+    sys.exit(1 if failed or len(ok) < len(results) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# app/, mcp_server/ 모듈은 서로를 `from extract import ...` 형태로 가져오므로 경로에 추가
+ROOT = Path(__file__).resolve().parents[1]
+for sub in ('app', 'mcp_server'):
+    path = str(ROOT / sub)
+    if path not in sys.path:
+        sys.path.insert(0, path)
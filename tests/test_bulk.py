@@ -0,0 +1,48 @@
+import json
+
+from app.bulk import run_bulk, iter_tasks
+
+
+def test_bulk_extracts_directory_to_jsonl(tmp_path):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    for i in range(6):
+        (pages / f'p{i}.html').write_text(
+            f'<html><head><title>문서 {i}</title></head><body><article><p>본문 {i}</p></article></body></html>',
+            encoding='utf-8',
+        )
+    (pages / 'notes.txt').write_text('무시', encoding='utf-8')
+    out = tmp_path / 'out.jsonl'
+
+    stats = run_bulk(str(pages), output=str(out), workers=2, chunksize=2)
+
+    results = [json.loads(line) for line in out.read_text(encoding='utf-8').splitlines()]
+    assert stats['done'] == 6 and stats['errors'] == 0
+    assert sorted(r['title'] for r in results) == [f'문서 {i}' for i in range(6)]
+
+
+def test_jsonl_and_url_list_inputs(tmp_path):
+    docs = tmp_path / 'docs.jsonl'
+    docs.write_text('{"html": "<p>하나</p>"}\n\n{"id": "b", "path": "x.html"}\n', encoding='utf-8')
+    assert list(iter_tasks(str(docs))) == [
+        {'html': '<p>하나</p>', 'id': 'line-1'},
+        {'id': 'b', 'path': 'x.html'},
+    ]
+
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('# 주석\nhttps://a.com\n\nhttps://b.com\n', encoding='utf-8')
+    assert [t['url'] for t in iter_tasks(str(urls))] == ['https://a.com', 'https://b.com']
+
+
+def test_bad_jsonl_lines_become_error_results(tmp_path):
+    docs = tmp_path / 'docs.jsonl'
+    docs.write_text('{"html": "<title>좋은 줄</title><p>본문</p>"}\n{broken\n[1, 2]\n{"id": "c"}\n',
+                    encoding='utf-8')
+    out = tmp_path / 'out.jsonl'
+    stats = run_bulk(str(docs), output=str(out), workers=1)
+    results = {r['id']: r for r in map(json.loads, out.read_text(encoding='utf-8').splitlines())}
+    assert stats['done'] == 4 and stats['errors'] == 3
+    assert results['line-1']['title'] == '좋은 줄'
+    assert results['line-2']['error'].startswith('JSONDecodeError')
+    assert 'JSON object' in results['line-3']['error']
+    assert 'needs one of' in results['c']['error']
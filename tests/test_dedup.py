@@ -0,0 +1,67 @@
+import time
+
+from app import dedup
+from app.dedup import ArticleIndex, fingerprint, simhash, similarity
+
+ARTICLE = '\n'.join(
+    f'{i}번째 문단입니다. 파이썬의 제너레이터는 값을 하나씩 지연 계산하여 메모리를 절약합니다.'
+    for i in range(20)
+)
+
+
+def test_simhash_is_stable_for_whitespace_and_punctuation():
+    noisy = ARTICLE.replace('. ', ' ,  ').replace('\n', '\n\n  ')
+    assert similarity(simhash(ARTICLE), simhash(noisy)) == 1.0
+
+
+def test_index_matches_near_duplicate_and_ignores_unrelated(tmp_path):
+    index = ArticleIndex(str(tmp_path / 'articles.db'), threshold=0.9)
+    article_id = index.add('https://a.example/post', '제목', ARTICLE, summary='요약')
+
+    repost = ARTICLE + '\n출처: 원본 블로그'
+    match = index.find(repost)
+    assert match['id'] == article_id
+    assert match['summary'] == '요약'
+    assert match['quiz'] is None
+
+    index.record('https://b.example/repost', '제목', repost, match=match, quiz=[{'question': 'q'}])
+    assert index.find(ARTICLE)['quiz'] == [{'question': 'q'}]
+
+    unrelated = '러스트의 소유권 모델은 컴파일 시점에 메모리 안전성을 보장합니다. ' * 10
+    assert index.find(unrelated) is None
+
+
+def test_precomputed_hashes_are_used_without_rehashing(tmp_path, monkeypatch):
+    index = ArticleIndex(str(tmp_path / 'articles.db'))
+    hashes = fingerprint(ARTICLE)
+
+    def no_hashing(text):
+        raise AssertionError('hashed on the request thread')
+
+    monkeypatch.setattr(dedup, 'simhash', no_hashing)
+    monkeypatch.setattr(dedup, 'content_hash', no_hashing)
+    article_id = index.record('https://a.example/post', '제목', ARTICLE, summary='요약', hashes=hashes)
+    match = index.find(ARTICLE + '\n출처: 원본 블로그', hashes=hashes)
+    assert match['id'] == article_id and match['content_hash'] == hashes['content_hash']
+
+
+def test_short_text_is_not_indexed(tmp_path):
+    index = ArticleIndex(str(tmp_path / 'articles.db'))
+    assert index.add('https://a.example', '', '짧은 글') is None
+    assert index.find('짧은 글') is None
+
+
+def test_aliases_are_not_overwritten_and_entries_expire(tmp_path, monkeypatch):
+    index = ArticleIndex(str(tmp_path / 'articles.db'), ttl=100)
+    first = index.record('https://a.example/post', '제목', ARTICLE, summary='요약')
+    other = index.add('https://b.example/other', '다른 글', ARTICLE.replace('파이썬', '자바'))
+    index.add_aliases(other, ['https://a.example/post'])
+    assert index.find_by_url('https://a.example/post')['id'] == first
+
+    # 유효 기간이 지나면 캐시로 쓰지 않고, 별칭도 새 글로 옮길 수 있음
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 200)
+    assert index.find_by_url('https://a.example/post') is None
+    assert index.find(ARTICLE) is None
+    fresh = index.record('https://a.example/post', '제목', ARTICLE, summary='새 요약')
+    assert index.find_by_url('https://a.example/post')['id'] == fresh != first
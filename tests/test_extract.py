@@ -1,4 +1,9 @@
-from app.extract import extract_text
+import os
+from pathlib import Path
+
+import pytest
+
+from app.extract import extract_text, extract_page
 
 
 def test_extract_from_simple_html():
@@ -34,3 +39,67 @@ def test_extract_fallback_paragraphs():
     title, text = extract_text(html)
     assert text.count('\n\n') >= 1
     assert '하나.' in text
+
+
+def test_extract_page_returns_absolute_canonical_url():
+    html = """
+    <html>
+      <head>
+        <title>원문</title>
+        <link rel="canonical" href="/original/1">
+      </head>
+      <body><article><p>본문입니다.</p></article></body>
+    </html>
+    """
+    page = extract_page(html, url='https://blog.example.com/repost?utm_source=x')
+    assert page['title'] == '원문'
+    assert '본문입니다.' in page['text']
+    assert page['canonical_url'] == 'https://blog.example.com/original/1'
+
+
+def test_js_sites_can_extract_in_browser(monkeypatch):
+    from app import extract
+
+    doc = {'title': '렌더링된 글', 'text': '브라우저에서 추출한 본문', 'canonical_url': 'https://velog.io/@a/post'}
+    monkeypatch.setitem(extract.FETCH_BACKENDS, 'selenium_dom',
+                        lambda url, timeout: {'html': None, 'doc': doc, 'url': url, 'final_url': url})
+    monkeypatch.setattr(extract.http_pool, 'check', lambda url, headers=None: 0)
+
+    assert extract.select_backends('https://velog.io/@a/post', in_browser=False) == ['selenium', 'requests']
+    page = extract.fetch_page('https://velog.io/@a/post', in_browser=True)
+    assert page['backend'] == 'selenium_dom' and page['html'] is None
+    assert page['doc'] == doc
+    # 브라우저 추출 스크립트는 execute_script에 함수 본문으로 넘겨짐
+    assert extract.dom_extract_script().rstrip().endswith('};')
+
+
+# dom_extract.js가 extract_page()와 같은 결과를 내는지 확인할 페이지들
+# (CI에서 scripts/compare_dom_extract.py의 코퍼스로도 사용)
+PARITY_DIR = Path(__file__).parent / 'fixtures' / 'dom_extract'
+PARITY_PAGES = sorted(p.name for p in PARITY_DIR.glob('*.html'))
+
+
+@pytest.fixture(scope='module')
+def chrome():
+    from app.extract import create_driver
+    try:
+        driver = create_driver()
+    except Exception as e:
+        # CI(ubuntu-latest에는 Chrome이 있음)에서는 건너뛰지 않고 실패시킴
+        if os.environ.get('DOM_PARITY_REQUIRED') == '1':
+            raise
+        pytest.skip(f'headless Chrome unavailable: {type(e).__name__}')
+    yield driver
+    driver.quit()
+
+
+@pytest.mark.parametrize('name', PARITY_PAGES)
+def test_dom_extract_matches_extract_page(chrome, name):
+    from app.extract import extract_in_browser
+
+    chrome.get((PARITY_DIR / name).as_uri())
+    # 같은 렌더링 결과(page_source)를 파이썬으로 추출한 값과 비교 (dom_extract.js가 DOM을 바꾸므로 먼저)
+    expected = extract_page(chrome.page_source, url=chrome.current_url)
+    doc = extract_in_browser(chrome)
+    assert doc['title'] == expected['title']
+    assert doc['text'] == expected['text']
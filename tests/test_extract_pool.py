@@ -0,0 +1,76 @@
+import pytest
+
+from app.dedup import fingerprint
+from app.extract import extract_page
+from app.extract_pool import ExtractPool, ExtractQueueFull, prepare_html
+
+HTML = """<html><head><title>풀 테스트</title>
+<link rel="canonical" href="/post/1">
+<script>var s = "<article>가짜</article>";</script>
+<style>p { color: red; }</style></head>
+<body><article><p>워커 프로세스에서 추출한 본문입니다.</p><p>두 번째 문단.</p></article></body></html>"""
+
+
+def test_prepare_html_strips_scripts_and_limits_size():
+    data = prepare_html(HTML)
+    assert b'<script' not in data and b'<style' not in data
+    assert b'<link rel="canonical"' in data
+    assert len(prepare_html('가' * 100, max_bytes=10)) == 10
+
+
+def test_pool_matches_in_process_extraction():
+    pool = ExtractPool(workers=1, queue_size=2, timeout=30)
+    try:
+        pool.start()
+        result = pool.extract(HTML, url='https://a.com/x')
+    finally:
+        pool.shutdown()
+    expected = extract_page(HTML, url='https://a.com/x')
+    # SimHash/content_hash도 워커에서 계산해 옴 (요청 스레드에서 다시 계산하지 않음)
+    assert result == {**expected, **fingerprint(expected['text'])}
+    assert result['canonical_url'] == 'https://a.com/post/1'
+    assert pool.stats['tasks'] == 1
+
+
+def test_rejects_when_queue_is_full():
+    pool = ExtractPool(workers=1, queue_size=1)
+    pool._slots.acquire()
+    with pytest.raises(ExtractQueueFull):
+        pool.extract(HTML)
+    assert pool.stats['rejected'] == 1
+
+
+def test_timeout_replaces_only_the_stuck_worker():
+    import threading
+
+    from app.extract_pool import ExtractTimeout
+
+    pool = ExtractPool(workers=2, queue_size=4, timeout=0.2)
+    try:
+        pool.start()
+        before = set(pool.worker_pids())
+        huge = '<div class=content>' + '<p>문단 텍스트 ' * 200000 + '</div>'
+        results = {}
+
+        def quick():
+            results['quick'] = pool.extract(HTML)
+
+        def stuck():
+            with pytest.raises(ExtractTimeout):
+                pool.extract(huge)
+            results['stuck'] = True
+
+        slow = threading.Thread(target=stuck)
+        slow.start()
+        quick_thread = threading.Thread(target=quick)
+        quick_thread.start()
+        slow.join()
+        quick_thread.join()
+
+        # 다른 워커의 작업은 그대로 성공하고, 멈춘 워커 하나만 교체됨
+        assert results['stuck'] and results['quick']['title'] == '풀 테스트'
+        after = set(pool.worker_pids())
+        assert len(after) == 2 and len(before & after) == 1
+        assert pool.stats['timeouts'] == 1 and pool.stats['restarts'] == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,102 @@
+from app.feeds import FeedStore, FeedScheduler, parse_feed, poll_feed, in_offpeak
+from datetime import datetime
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>blog</title>
+  <item><title>old</title><link>https://blog.example.com/1?utm_source=rss</link>
+    <pubDate>Mon, 01 Jan 2024 00:00:00 +0000</pubDate></item>
+  <item><title>new</title><link>https://blog.example.com/2</link>
+    <pubDate>Tue, 02 Jan 2024 00:00:00 +0000</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><title>a</title><link rel="alternate" href="https://a.com/x"/><updated>2024-01-03T00:00:00Z</updated></entry>
+</feed>"""
+
+SITEMAP = b"""<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://s.com/p1</loc><lastmod>2024-01-01</lastmod></url>
+</urlset>"""
+
+
+class FakeResponse:
+    def __init__(self, status, content=b'', headers=None):
+        self.status_code = status
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def test_parse_rss_atom_and_sitemap():
+    kind, entries = parse_feed(RSS)
+    assert kind == 'rss'
+    assert [e['title'] for e in entries] == ['new', 'old']
+    assert parse_feed(ATOM)[1][0]['url'] == 'https://a.com/x'
+    assert parse_feed(SITEMAP)[0] == 'sitemap'
+
+
+def test_poll_uses_conditional_get_and_only_queues_new_entries(tmp_path):
+    store = FeedStore(str(tmp_path / 'feeds.db'))
+    store.subscribe('https://blog.example.com/rss')
+    session = FakeSession([
+        FakeResponse(200, RSS, {'ETag': '"v1"'}),
+        FakeResponse(304),
+        FakeResponse(200, RSS, {'ETag': '"v2"'}),
+    ])
+
+    assert poll_feed(store, store.feeds()[0], session=session) == 2
+    assert poll_feed(store, store.feeds()[0], session=session) == 0
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert poll_feed(store, store.feeds()[0], session=session) == 0
+    # 가져올 때는 피드의 원래 링크를 사용 (정규화 URL은 중복 판정에만 사용)
+    assert store.pending(10) == ['https://blog.example.com/2', 'https://blog.example.com/1?utm_source=rss']
+
+
+def test_scheduler_prefetches_only_when_idle(tmp_path):
+    store = FeedStore(str(tmp_path / 'feeds.db'))
+    store.add_entries('f', [{'url': 'https://a.com/1', 'title': '', 'published': 1.0}])
+    processed = []
+    busy = [True]
+    scheduler = FeedScheduler(store, process_entry=processed.append, is_busy=lambda: busy[0], offpeak_hours='0-24')
+
+    assert scheduler.run_batch() == 0
+    assert processed == []
+    busy[0] = False
+    assert scheduler.run_batch() == 1
+    assert processed == ['https://a.com/1']
+    assert store.pending(10) == []
+
+
+def test_offpeak_window_wraps_midnight():
+    assert in_offpeak(datetime(2024, 1, 1, 23), '22-6')
+    assert in_offpeak(datetime(2024, 1, 1, 3), '22-6')
+    assert not in_offpeak(datetime(2024, 1, 1, 12), '22-6')
+
+
+def test_failed_prefetch_is_retried_then_marked_failed(tmp_path):
+    store = FeedStore(str(tmp_path / 'feeds.db'))
+    store.add_entries('f', [{'url': 'http://www.a.com/1/', 'title': '', 'published': 1.0}])
+    calls = []
+
+    def failing(url):
+        calls.append(url)
+        raise RuntimeError('ollama down')
+
+    scheduler = FeedScheduler(store, process_entry=failing, offpeak_hours='0-24')
+    for _ in range(4):
+        scheduler.run_batch()
+    assert calls == ['http://www.a.com/1/'] * 3
+    assert store.pending(10) == []
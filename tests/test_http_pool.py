@@ -0,0 +1,99 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.http_pool import HostPool, RobotsDisallowed, _retry_policy
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    flaky_left = 1
+    robots_hits = 0
+
+    def do_GET(self):
+        if self.path == '/robots.txt':
+            _Handler.robots_hits += 1
+            time.sleep(0.05)
+            body, status = b'User-agent: *\nDisallow: /private\n', 200
+        elif self.path == '/flaky' and _Handler.flaky_left > 0:
+            _Handler.flaky_left -= 1
+            body, status = b'busy', 503
+        else:
+            body, status = b'ok', 200
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_reuses_connections_per_host(server):
+    pool = HostPool(concurrency=1, min_interval=0)
+    for i in range(5):
+        assert pool.get(f'{server}/page{i}').text == 'ok'
+    stats = pool.stats()['hosts'][server]
+    # robots.txt + 5 pages over a single keep-alive connection
+    assert stats['requests'] == 6
+    assert stats['connections'] == 1
+    assert stats['reuse_ratio'] > 0.8
+
+
+def test_robots_disallow_and_retry(server):
+    pool = HostPool(min_interval=0)
+    with pytest.raises(RobotsDisallowed):
+        pool.get(f'{server}/private/doc')
+    assert pool.get(f'{server}/private/doc', respect_robots=False).status_code == 200
+    _Handler.flaky_left = 1
+    assert pool.get(f'{server}/flaky').status_code == 200
+
+
+def test_min_interval_spaces_requests(server):
+    pool = HostPool(min_interval=0.1, respect_robots=False)
+    started = time.monotonic()
+    for _ in range(3):
+        pool.get(f'{server}/page')
+    assert time.monotonic() - started >= 0.2
+
+
+def test_robots_fetched_once_under_concurrency(server):
+    pool = HostPool(concurrency=8, min_interval=0)
+    _Handler.robots_hits = 0
+    threads = [threading.Thread(target=pool.check, args=(f'{server}/p{i}',)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _Handler.robots_hits == 1
+
+
+def test_host_sessions_are_bounded(server):
+    pool = HostPool(min_interval=0, respect_robots=False, max_hosts=1)
+    pool.get(f'{server}/a')
+    pool.get(server.replace('127.0.0.1', 'localhost') + '/b')
+    assert list(pool.stats()['hosts']) == [server.replace('127.0.0.1', 'localhost')]
+
+
+class _Resp:
+    def __init__(self, retry_after):
+        self.headers = {'Retry-After': retry_after}
+
+
+def test_retry_after_is_capped():
+    retry = _retry_policy()
+    assert retry.get_retry_after(_Resp('3600')) == retry.max_retry_after
+    assert retry.get_retry_after(_Resp('1')) == 1
+    assert retry.new(total=1).get_retry_after(_Resp('3600')) == retry.max_retry_after
@@ -0,0 +1,226 @@
+import os
+import tempfile
+import time
+
+os.environ.setdefault('CACHE_DIR', tempfile.mkdtemp(prefix='app-cache-'))
+os.environ.pop('MCP_HOST', None)
+os.environ['FEED_SCHEDULER_ENABLED'] = '0'
+
+import pytest
+
+from app import main
+from app.dedup import ArticleIndex
+
+TEXT = '\n'.join(f'{i}번째 문단. 캐시 가능한 응답은 같은 요청을 다시 계산하지 않습니다.' for i in range(20))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    calls = {'load': 0, 'summarize': 0}
+
+    def fake_load_article(url):
+        calls['load'] += 1
+        return {'title': '제목', 'text': TEXT, 'canonical_url': 'https://a.com/post',
+                'aliases': ['https://a.com/post']}
+
+    def fake_summarize(text):
+        calls['summarize'] += 1
+        return '요약입니다.'
+
+    monkeypatch.setattr(main, 'article_index', ArticleIndex(str(tmp_path / 'articles.db')))
+    monkeypatch.setattr(main, 'uploader', None)
+    monkeypatch.setattr(main, 'load_article', fake_load_article)
+    monkeypatch.setattr(main, 'summarize_with_ollama', fake_summarize)
+    c = main.app.test_client()
+    c.calls = calls
+    return c
+
+
+def test_process_sets_etag_and_answers_conditional_requests(client):
+    first = client.post('/process', json={'url': 'https://a.com/post?utm_source=x'})
+    assert first.status_code == 200
+    assert first.json['summary'] == '요약입니다.'
+    etag = first.headers['ETag']
+    assert 'max-age' in first.headers['Cache-Control']
+
+    # GET 변형은 같은 결과와 ETag를 주고, 본문을 다시 가져오지 않음
+    again = client.get('/process?url=https://a.com/post/')
+    assert again.headers['ETag'] == etag
+    assert again.json['summary'] == '요약입니다.'
+
+    not_modified = client.get('/process?url=https://a.com/post', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert client.calls == {'load': 1, 'summarize': 1}
+
+
+
+def test_cached_result_keeps_etag_of_its_prompt_version(client, monkeypatch):
+    from app import prompts
+
+    etag = client.post('/process', json={'url': 'https://a.com/post'}).headers['ETag']
+    # 프롬프트 버전을 바꿔도 캐시된 요약은 v1로 만든 것이므로 ETag가 그대로여야 함
+    monkeypatch.setitem(prompts.PROMPT_TEMPLATES, ('summary', 'v2'), prompts.PROMPT_TEMPLATES[('summary', 'v1')])
+    monkeypatch.setenv('PROMPT_SUMMARY_VERSION', 'v2')
+    assert client.get('/process?url=https://a.com/post').headers['ETag'] == etag
+    assert client.calls['summarize'] == 1
+
+
+def test_cache_hits_match_first_response_and_etag(client, monkeypatch):
+    # 요청 URL과 페이지가 선언한 canonical이 달라도 캐시 적중 응답은 첫 응답과 같아야 함
+    first = client.post('/process', json={'url': 'https://a.com/other'})
+    again = client.post('/process', json={'url': 'https://a.com/other'})
+    assert first.json == again.json and first.json['canonical_url'] == 'https://a.com/post'
+    assert first.headers['ETag'] == again.headers['ETag']
+
+    # 유사 문서(match)에 합쳐 저장한 퀴즈의 ETag는 이후 캐시 적중과 같아야 함
+    monkeypatch.setattr(main, 'generate_quiz_with_ollama', lambda text: [{'question': '문제', 'answer': True}])
+    monkeypatch.setattr(main, 'load_article', lambda url: {
+        'title': '퍼간 글', 'text': TEXT + '\n출처: 원문', 'canonical_url': 'https://b.com/copy',
+        'aliases': ['https://b.com/copy']})
+    quiz = client.post('/quiz', json={'url': 'https://b.com/copy'})
+    cached = client.post('/quiz', json={'url': 'https://b.com/copy'})
+    assert quiz.json == cached.json and quiz.json['canonical_url'] == 'https://a.com/post'
+    assert quiz.headers['ETag'] == cached.headers['ETag']
+
+
+def test_errors_are_not_cacheable(client):
+    resp = client.post('/process', json={})
+    assert resp.status_code == 400
+    assert resp.headers['Cache-Control'] == 'no-store'
+
+
+def test_process_speculates_quiz_for_followup(client, monkeypatch):
+    from app.speculative import SpeculativeRunner
+
+    quiz = [{'question': '캐시는 같은 요청을 다시 계산하지 않는다', 'answer': True, 'difficulty': 1,
+             'importance': '중간', 'explanation': '본문 참고'}]
+    generated = []
+
+    def fake_quiz(text, cancel=None):
+        generated.append(cancel)
+        return quiz
+
+    speculator = SpeculativeRunner(main.is_busy, idle_check=0.01)
+    monkeypatch.setattr(main, 'quiz_speculator', speculator)
+    monkeypatch.setattr(main, 'SPECULATIVE_QUIZ', True)
+    monkeypatch.setattr(main, 'generate_quiz_with_ollama', fake_quiz)
+
+    assert client.post('/process', json={'url': 'https://a.com/post'}).status_code == 200
+    for _ in range(200):
+        if speculator.stats['completed']:
+            break
+        time.sleep(0.01)
+
+    resp = client.post('/quiz', json={'url': 'https://a.com/post'})
+    assert resp.json['quiz'] == quiz
+    # 퀴즈는 추측 실행에서 한 번만 생성되었고, /quiz는 본문을 다시 가져오지 않음
+    assert len(generated) == 1 and generated[0] is not None
+    assert client.calls['load'] == 1
+    speculator.stop()
+
+
+def test_quiz_bank_is_generated_once_and_sampled(client, monkeypatch):
+    bank = [{'question': f'{level}단계 문제 {i}번에 대한 서술', 'answer': i % 2 == 0, 'difficulty': level,
+             'importance': '중간', 'explanation': '본문 참고'} for level in (1, 2, 3) for i in range(3)]
+    calls = []
+
+    def fake_bank(text, cancel=None):
+        calls.append(text)
+        return bank
+
+    monkeypatch.setattr(main, 'generate_quiz_bank_with_ollama', fake_bank)
+
+    first = client.get('/quiz?url=https://a.com/post&mode=balanced&count=3&seed=1')
+    assert first.status_code == 200
+    assert first.json['bank_size'] == 9
+    assert sorted(q['difficulty'] for q in first.json['quiz']) == [1, 2, 3]
+    assert 'ETag' in first.headers
+
+    # seed 없는 무작위 선택은 캐시하지 않고, 뱅크는 저장된 것을 재사용
+    other = client.get('/quiz?url=https://a.com/post&mode=random&count=4')
+    assert other.json['quiz_count'] == 4
+    assert other.headers['Cache-Control'] == 'no-store'
+    assert len(calls) == 1 and client.calls['load'] == 1
+
+    assert client.get('/quiz?url=https://a.com/post&mode=hard').status_code == 400
+    assert client.post('/quiz', json={'url': 'https://a.com/post', 'mode': 'random', 'seed': [1]}).status_code == 400
+
+
+def test_short_article_falls_back_to_plain_quiz(client, monkeypatch):
+    quiz = [{'question': '짧은 글 문제', 'answer': True}]
+    banks = []
+    monkeypatch.setattr(main, 'load_article', lambda url: {
+        'title': '짧은 글', 'text': '짧은 본문입니다.', 'canonical_url': 'https://a.com/short',
+        'aliases': ['https://a.com/short']})
+    monkeypatch.setattr(main, 'generate_quiz_bank_with_ollama', lambda text, cancel=None: banks.append(text))
+    monkeypatch.setattr(main, 'generate_quiz_with_ollama', lambda text, cancel=None: quiz)
+
+    # 인덱스에 저장할 수 없는 짧은 글은 버려질 뱅크를 만들지 않고 일반 퀴즈로 응답
+    resp = client.get('/quiz?url=https://a.com/short&mode=balanced&count=3')
+    assert resp.status_code == 200 and resp.json['quiz'] == quiz
+    assert banks == []
+
+
+def test_profile_flag_writes_downloadable_profile(client, tmp_path, monkeypatch):
+    from app.profiling import RequestProfiler
+
+    monkeypatch.setattr(main, 'profiler', RequestProfiler(directory=str(tmp_path), token='t0k'))
+    assert 'X-Profile-Id' not in client.get('/health').headers
+
+    resp = client.post('/process', json={'url': 'https://a.com/post'}, headers={'X-Profile': 't0k'})
+    name = resp.headers['X-Profile-Id']
+    assert name.endswith('.prof') and resp.headers['Cache-Control'] == 'no-store'
+
+    assert client.get('/admin/profiles').status_code == 404
+    listing = client.get('/admin/profiles', headers={'X-Profile-Token': 't0k'})
+    assert [p['name'] for p in listing.json['profiles']] == [name]
+    # 토큰은 헤더로만 받음
+    assert client.get(f'/admin/profiles/{name}?token=t0k').status_code == 404
+    download = client.get(f'/admin/profiles/{name}', headers={'X-Profile-Token': 't0k'})
+    assert download.status_code == 200 and download.data
+    assert 'X-Profile-Id' not in client.post('/process?profile=t0k', json={'url': 'https://a.com/post'}).headers
+
+
+def test_video_without_subtitles_is_client_error(client, monkeypatch):
+    def no_subtitles(url):
+        raise main.TranscriptUnavailable('no subtitles available')
+
+    monkeypatch.setattr(main, 'load_article', no_subtitles)
+    url = 'https://youtu.be/dQw4w9WgXcQ'
+    assert client.post('/process', json={'url': url}).status_code == 422
+    assert client.post('/quiz', json={'url': url}).status_code == 422
+
+
+def test_ollama_generate_caps_output_to_reserved_tokens(monkeypatch):
+    sent = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'response': '요약'}
+
+    class FakeSession:
+        def post(self, url, json=None, timeout=None):
+            sent.append(json)
+            return FakeResponse()
+
+    monkeypatch.setattr(main, 'ollama_session', FakeSession())
+    built = main.build_prompt('summary', '본문입니다.')
+    assert main.ollama_generate(built, timeout=1)['response'] == '요약'
+    assert sent[0]['options'] == {'num_ctx': main.DEFAULT_NUM_CTX, 'num_predict': built['reserve_tokens']}
+
+
+def test_speculation_yields_to_feed_prefetch(client, monkeypatch):
+    seen = []
+
+    def fake_summarize(text):
+        seen.append(main.speculation_busy())
+        return '요약입니다.'
+
+    monkeypatch.setattr(main, 'summarize_with_ollama', fake_summarize)
+    assert main.speculation_busy() is False
+    main.prefetch_summary('https://a.com/post')
+    # 사전 요약 중에는 추측 생성이 시작되지 않고, 끝나면 다시 한가함
+    assert seen == [True] and main.speculation_busy() is False
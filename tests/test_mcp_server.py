@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='mcp-data-'))
+
+import pytest
+
+from mcp_server import server
+from app.mcp_client import MCPUploader
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(server, 'file_index', server.FileIndex(str(tmp_path)))
+    monkeypatch.setattr(server, 'search_index', server.SearchIndex(str(tmp_path)))
+    return server.app.test_client()
+
+
+def test_batch_upload_accepts_gzip_body(client, tmp_path):
+    body = gzip.compress(json.dumps({'files': [
+        {'filename': 'a.md', 'content': '# 가'},
+        {'filename': '../b.md', 'content': '# 나'},
+        {'filename': 'c.md'},
+    ]}).encode('utf-8'))
+    resp = client.post('/upload/batch', data=body,
+                       headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip'})
+    assert resp.status_code == 207
+    assert resp.json['saved'] == ['a.md', 'b.md']
+    assert len(resp.json['errors']) == 1
+    assert (tmp_path / 'b.md').read_text(encoding='utf-8') == '# 나'
+    # 임시 파일(0600)이 아니라 일반 파일 권한으로 저장
+    assert (tmp_path / 'b.md').stat().st_mode & 0o777 == server.FILE_MODE
+    assert [f['name'] for f in client.get('/files').json['files']] == ['a.md', 'b.md']
+
+
+def test_batch_upload_rejects_malformed_bodies(client, tmp_path):
+    gz = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    truncated = gzip.compress(json.dumps({'files': [{'filename': 'a.md', 'content': 'x' * 1000}]}).encode())[:-10]
+    assert client.post('/upload/batch', data=truncated, headers=gz).status_code == 400
+    for files in (['a.md'], [{'filename': 'a.md', 'content': 1}], [{'filename': ['a.md'], 'content': 'x'}]):
+        assert client.post('/upload/batch', json={'files': files}).status_code == 400
+    assert client.post('/upload/batch', json=[1]).status_code == 400
+    assert not (tmp_path / 'a.md').exists()
+
+
+def test_listing_paginates_filters_and_revalidates(client, tmp_path):
+    for name in ['x-1.md', 'x-2.md', 'x-3.md', 'y-1.md']:
+        client.post('/upload', json={'filename': name, 'content': name})
+
+    first = client.get('/files?prefix=x-&limit=2')
+    assert [f['name'] for f in first.json['files']] == ['x-1.md', 'x-2.md']
+    assert first.json['files'][0]['size'] == len('x-1.md')
+    cursor = first.json['next_cursor']
+    second = client.get(f'/files?prefix=x-&limit=2&cursor={cursor}')
+    assert [f['name'] for f in second.json['files']] == ['x-3.md']
+    assert second.json['next_cursor'] is None
+
+    etag = first.headers['ETag']
+    assert client.get('/files?prefix=x-&limit=2', headers={'If-None-Match': etag}).status_code == 304
+    client.post('/upload', json={'filename': 'x-0.md', 'content': 'new'})
+    assert client.get('/files?prefix=x-&limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+    # 서버를 거치지 않고 추가된 파일도 반영
+    (tmp_path / 'z.md').write_text('z')
+    assert 'z.md' in [f['name'] for f in client.get('/files?prefix=z').json['files']]
+
+
+class _TestClientSession:
+    """requests.Session 대신 Flask 테스트 클라이언트로 보내는 어댑터"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = 0
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        self.calls += 1
+        resp = self.client.post(url.replace('http://mcp', ''), data=data, headers=headers)
+        resp.raise_for_status = lambda: None
+        return resp
+
+
+def test_uploader_batches_results(client, tmp_path):
+    session = _TestClientSession(client)
+    uploader = MCPUploader('http://mcp', batch_size=10, flush_interval=0.2, session=session)
+    uploader.save_summary('https://a.com/x?utm_source=y', '제목', '요약입니다.')
+    uploader.save_quiz('https://a.com/x', '제목', [{'question': '문장', 'answer': True, 'explanation': '근거'}])
+    uploader.flush()
+    uploader.close()
+
+    assert session.calls == 1
+    names = sorted(n for n in os.listdir(tmp_path) if not n.startswith('.'))
+    assert len(names) == 2 and names[0].endswith('-quiz.md') and names[1].endswith('-summary.md')
+    assert names[0].split('-')[0] == names[1].split('-')[0]
+    assert '요약입니다.' in (tmp_path / names[1]).read_text(encoding='utf-8')
+
+
+def test_streaming_put_and_conditional_range_download(client, tmp_path):
+    data = ('요약 ' * 5000).encode('utf-8')
+    checksum = hashlib.sha256(data).hexdigest()
+
+    bad = client.put('/files/big.md', data=data, headers={'X-Content-SHA256': '0' * 64})
+    assert bad.status_code == 422
+    assert not (tmp_path / 'big.md').exists()
+
+    resp = client.put('/files/big.md', data=data, headers={'X-Content-SHA256': checksum})
+    assert resp.status_code == 201
+    assert resp.json == {'saved': 'big.md', 'size': len(data), 'sha256': checksum}
+
+    full = client.get('/files/big.md')
+    assert full.data == data
+    assert full.headers['ETag'] == f'"{checksum}"'
+    assert client.get('/files/big.md', headers={'If-None-Match': full.headers['ETag']}).status_code == 304
+
+    part = client.get('/files/big.md', headers={'Range': 'bytes=0-6'})
+    assert part.status_code == 206
+    assert part.data == data[:7]
+
+
+def test_search_ranks_korean_documents(client, tmp_path):
+    client.post('/upload', json={'filename': 'a-summary.md',
+                                 'content': '# 파이썬 제너레이터\n\n## 요약\n\n제너레이터는 값을 지연 계산합니다.'})
+    client.post('/upload', json={'filename': 'b-summary.md',
+                                 'content': '# 러스트 소유권\n\n## 요약\n\n소유권은 메모리 안전성을 보장합니다. 제너레이터 언급.'})
+    client.put('/files/c.bin', data=b'\x00\x01')
+
+    resp = client.get('/search?q=제너레이터')
+    names = [r['name'] for r in resp.json['results']]
+    assert names == ['a-summary.md', 'b-summary.md']
+    assert resp.json['results'][0]['title'] == '파이썬 제너레이터'
+    assert '제너레이터' in resp.json['results'][0]['snippet']
+
+    assert [r['name'] for r in client.get('/search?q=메모리 안전').json['results']] == ['b-summary.md']
+    assert client.get('/search?q=없는단어').json['results'] == []
+
+    # 다시 업로드하면 색인도 교체
+    client.post('/upload', json={'filename': 'b-summary.md', 'content': '# 러스트\n\n빌림 검사기'})
+    assert [r['name'] for r in client.get('/search?q=제너레이터').json['results']] == ['a-summary.md']
+
+    # 서버 밖에서 추가된 파일도 검색 시 따라잡음
+    (tmp_path / 'd.md').write_text('# 외부 파일\n\n빌림 규칙', encoding='utf-8')
+    assert {r['name'] for r in client.get('/search?q=빌림').json['results']} == {'b-summary.md', 'd.md'}
+
+
+def test_pending_upload_does_not_trigger_rescan(client, tmp_path):
+    client.post('/upload', json={'filename': 'a.md', 'content': 'a'})
+    changed = []
+
+    class SlowStream:
+        chunks = [b'x' * 10, b'']
+
+        def read(self, size):
+            # 업로드 도중 목록 요청이 와도 DATA_DIR mtime은 그대로여야 함
+            changed.append(server.file_index.refresh_if_changed())
+            return self.chunks.pop(0)
+
+    server._atomic_write_stream(str(tmp_path / 'b.md'), SlowStream())
+    assert changed == [False, False]
+    assert (tmp_path / 'b.md').read_bytes() == b'x' * 10
@@ -0,0 +1,61 @@
+import threading
+import time
+
+from app.profiling import RequestProfiler, StackSampler
+
+
+def _busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_sampled_profile_is_collapsed_stack(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), sample_rate=1.0)
+    mode = profiler.choose_mode(None)
+    assert mode == 'sample'
+    handle = profiler.start(mode)
+    _busy_loop(0.1)
+    name = profiler.finish(handle, 'quiz')
+
+    lines = (tmp_path / name).read_text(encoding='utf-8').splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert int(count) > 0
+    assert '_busy_loop (test_profiling.py' in stack
+
+
+def test_on_demand_requires_token_and_prunes(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), token='secret', max_files=2)
+    assert profiler.choose_mode('wrong') is None
+    assert profiler.choose_mode('비밀') is None
+    assert profiler.choose_mode('secret') == 'cprofile'
+    assert profiler.choose_mode('secret', 'sample') == 'sample'
+    for _ in range(3):
+        profiler.finish(profiler.start('cprofile'), 'process')
+        time.sleep(0.01)
+    files = profiler.list()
+    assert len(files) == 2 and all(f['kind'] == 'cprofile' for f in files)
+
+
+def test_discard_unregisters_sampler(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), sample_rate=1.0)
+    handle = profiler.start('sample')
+    profiler.discard(handle)
+    assert profiler.sampler._threads == {}
+    assert profiler.list() == []
+
+
+def test_sampler_wakes_for_thread_added_while_idle():
+    sampler = StackSampler(interval=0.001)
+    for _ in range(50):
+        # 샘플러가 빈 상태로 잠들려는 순간에 add()가 끼어들어도 샘플을 모아야 함
+        counts = sampler.add(threading.get_ident())
+        # 깨어나기만 하면 곧 샘플이 쌓이므로, 부하가 있는 환경을 감안해 넉넉히 기다림
+        deadline = time.monotonic() + 2
+        while not counts and time.monotonic() < deadline:
+            _busy_loop(0.005)
+        sampler.remove(threading.get_ident())
+        assert sum(counts.values()) > 0
@@ -0,0 +1,41 @@
+from app.prompts import build_prompt, estimate_tokens, fit_text, SYSTEM_PREFIX
+
+
+def test_prompt_shares_system_prefix_and_ends_with_text():
+    summary = build_prompt('summary', '짧은 글입니다.', model='qwen2.5')
+    quiz = build_prompt('quiz', '짧은 글입니다.', model='qwen2.5')
+    assert summary['system'] == quiz['system'] == SYSTEM_PREFIX
+    assert summary['prompt'].endswith('짧은 글입니다.\n\n한국어 요약:')
+    assert summary['version'] == 'summary@v1'
+    assert summary['truncated'] is False
+
+
+def test_long_text_is_fitted_to_context_budget():
+    text = '\n\n'.join(['가나다라마바사아자차카타파하 문장입니다.'] * 500)
+    built = build_prompt('quiz', text, model='qwen2.5', num_ctx=2048)
+    assert built['truncated'] is True
+    assert built['prompt_tokens'] <= 2048 - 600
+    # 출력 상한(num_predict)과 합쳐도 컨텍스트를 넘지 않음
+    assert built['reserve_tokens'] == 600
+    assert built['prompt_tokens'] + built['reserve_tokens'] <= 2048
+    # 예산을 대부분 채워야 함
+    assert built['prompt_tokens'] > (2048 - 600) * 0.7
+
+
+def test_fit_text_cuts_on_paragraph_boundary():
+    first = '첫 문단입니다. ' * 10
+    text = first + '\n\n' + '두 번째 문단 ' * 100
+    cut = fit_text(text, estimate_tokens(first + '\n\n두 번째'))
+    assert cut == first.rstrip()
+
+
+def test_quiz_bank_prompt_asks_for_configured_count():
+    built = build_prompt('quiz_bank', '본문', count=20)
+    assert '퀴즈 20개' in built['prompt'] and '{count}' not in built['prompt']
+
+
+def test_quiz_bank_reserves_output_per_question():
+    text = '\n\n'.join(['가나다라마바사아자차카타파하 문장입니다.'] * 2000)
+    small = build_prompt('quiz_bank', text, model='qwen2.5', num_ctx=4096, count=6)
+    large = build_prompt('quiz_bank', text, model='qwen2.5', num_ctx=4096, count=20)
+    assert large['prompt_tokens'] < small['prompt_tokens'] <= 4096 - (100 + 110 * 6)
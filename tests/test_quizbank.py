@@ -0,0 +1,38 @@
+from app.quizbank import dedupe_questions, parse_bank_response, question_similarity, sample_quiz
+
+RESPONSE = """퀴즈:
+1. 캐시는 같은 요청을 다시 계산하지 않는다 | O | 하 | 첫 문단 참고
+2. 캐시는 같은 요청을 다시 계산하지 않습니다 | O | 중 | 중복 문제
+3. ETag는 응답 본문의 식별자이다 | O | 상 | 두 번째 문단
+4. 304 응답에는 본문이 포함된다 | X | 중 | 304는 본문이 없음
+5. [문장] | O | 하 | [근거]
+6. 漢字が入った問題です | X | 하 | 외국어
+7. 난이도 없이 답한 문제입니다 | X | 본문과 다름
+"""
+
+
+def test_parse_validates_and_reads_difficulty():
+    items = parse_bank_response(RESPONSE)
+    questions = [item['question'] for item in items]
+    assert len(items) == 5
+    assert '[문장]' not in questions
+    assert items[0]['difficulty'] == 1 and items[0]['answer'] is True
+    assert items[2]['difficulty'] == 3 and items[2]['importance'] == '높음'
+    assert items[3]['answer'] is False
+    # 난이도가 빠지면 중간 난이도, 셋째 칸은 해설로 사용
+    assert items[4]['difficulty'] == 2 and items[4]['explanation'] == '본문과 다름'
+
+
+def test_dedupe_drops_near_duplicate_questions():
+    items = parse_bank_response(RESPONSE)
+    assert question_similarity(items[0]['question'], items[1]['question']) > 0.7
+    unique = dedupe_questions(items)
+    assert [item['question'] for item in unique] == [items[0]['question']] + [i['question'] for i in items[2:]]
+
+
+def test_sample_is_balanced_and_reproducible():
+    bank = [{'question': f'문제 {level}-{i}', 'difficulty': level} for level in (1, 2, 3) for i in range(4)]
+    picked = sample_quiz(bank, count=6, mode='balanced', seed='s1')
+    assert sorted(item['difficulty'] for item in picked) == [1, 1, 2, 2, 3, 3]
+    assert picked == sample_quiz(bank, count=6, mode='balanced', seed='s1')
+    assert len(sample_quiz(bank, count=20, mode='random')) == len(bank)
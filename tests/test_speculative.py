@@ -0,0 +1,60 @@
+import threading
+import time
+
+from app.speculative import GenerationCancelled, SpeculativeRunner
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_waits_until_idle_and_cancels_under_load():
+    busy = threading.Event()
+    busy.set()
+    started = threading.Event()
+    runner = SpeculativeRunner(busy.is_set, idle_check=0.01)
+
+    def task(cancel):
+        started.set()
+        while not cancel():
+            time.sleep(0.01)
+        raise GenerationCancelled()
+
+    runner.submit('a', task)
+    time.sleep(0.05)
+    assert not started.is_set() and runner.pending() == ['a']
+
+    busy.clear()
+    assert started.wait(1)
+    busy.set()
+    assert _wait_for(lambda: runner.stats['cancelled'] == 1)
+    runner.stop()
+
+
+def test_join_waits_for_running_task_and_drops_pending():
+    busy = threading.Event()
+    release = threading.Event()
+    runner = SpeculativeRunner(busy.is_set, idle_check=0.01, max_pending=1)
+    cancelled = []
+
+    def task(cancel):
+        release.wait(1)
+        cancelled.append(cancel())
+
+    runner.submit('a', task)
+    assert _wait_for(runner.active)
+    busy.set()
+    # 대기 중인 작업은 사용자 요청이 가져가므로 취소됨
+    runner.submit('b', task)
+    assert runner.join('b') is False and runner.pending() == []
+
+    # 실행 중인 작업을 기다리는 사용자가 있으면 바쁘더라도 취소하지 않음
+    threading.Timer(0.05, release.set).start()
+    assert runner.join('a', timeout=1) is True
+    assert cancelled == [False]
+    runner.stop()
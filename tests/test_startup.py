@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / 'app'
+
+
+def test_heavy_modules_are_not_imported_at_startup(tmp_path):
+    # 정적 페이지 경로(서버 기동, CLI, 대량 추출 워커)는 브라우저 스택을 불러오지 않아야 함
+    code = (
+        'import sys, json, main, bulk; '
+        "print(json.dumps([m for m in ('selenium', 'webdriver_manager', 'yt_dlp') if m in sys.modules]))"
+    )
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True, check=True,
+        env={k: v for k, v in dict(os.environ, CACHE_DIR=str(tmp_path)).items() if k != 'MCP_HOST'},
+    )
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
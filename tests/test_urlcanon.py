@@ -0,0 +1,32 @@
+from app.urlcanon import canonicalize_url, canonical_key, resolve_canonical
+
+
+def test_tracking_params_and_trailing_slash_are_removed():
+    a = canonicalize_url('https://blog.example.com/post/1/?utm_source=x&fbclid=abc&page=2#top')
+    b = canonicalize_url('http://www.blog.example.com:80/post/1?page=2')
+    assert a == b == 'https://blog.example.com/post/1?page=2'
+    assert canonical_key(a) == canonical_key(b)
+
+
+def test_mobile_host_and_tistory_mobile_path():
+    assert canonicalize_url('https://m.blog.naver.com/user/123') == 'https://blog.naver.com/user/123'
+    assert canonicalize_url('https://foo.tistory.com/m/45') == 'https://foo.tistory.com/45'
+    # 등록 도메인 자체는 유지
+    assert canonicalize_url('https://m.com/a') == 'https://m.com/a'
+
+
+def test_resolve_canonical_prefers_link_then_final_url():
+    assert resolve_canonical('https://a.com/x?utm_medium=y', 'https://a.com/y/', '/z') == 'https://a.com/z'
+    assert resolve_canonical('https://a.com/x', 'https://a.com/y/') == 'https://a.com/y'
+    assert resolve_canonical('https://a.com/x') == 'https://a.com/x'
+
+
+def test_cross_host_canonical_is_ignored():
+    # 다른 사이트를 canonical로 선언해도 가져온 URL 기준으로 캐시
+    assert resolve_canonical('https://evil.com/x', None, 'https://victim.com/post') == 'https://evil.com/x'
+    # www./모바일 서브도메인 차이는 같은 호스트
+    assert resolve_canonical('https://m.blog.com/1', None, 'https://www.blog.com/1') == 'https://blog.com/1'
+
+
+def test_ref_param_is_kept():
+    assert canonicalize_url('https://github.com/a/b/blob/x?ref=main') == 'https://github.com/a/b/blob/x?ref=main'
@@ -0,0 +1,44 @@
+from app.youtube import video_id, is_youtube_url, parse_vtt, chunk_cues, _pick_track
+from app.urlcanon import canonicalize_url
+
+VTT = """WEBVTT
+Kind: captions
+Language: ko
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+안녕하세요<00:00:00.500><c> 여러분</c>
+
+00:00:02.000 --> 00:00:04.000 align:start position:0%
+안녕하세요 여러분
+오늘은 파이썬을 배웁니다
+
+00:01:05.000 --> 00:01:07.000
+제너레이터를 알아봅시다
+"""
+
+
+def test_video_id_variants_share_canonical_url():
+    urls = [
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30s&utm_source=x',
+        'https://youtu.be/dQw4w9WgXcQ?si=abc',
+        'https://m.youtube.com/shorts/dQw4w9WgXcQ',
+    ]
+    assert {video_id(u) for u in urls} == {'dQw4w9WgXcQ'}
+    assert {canonicalize_url(u) for u in urls} == {'https://youtube.com/watch?v=dQw4w9WgXcQ'}
+    assert not is_youtube_url('https://www.youtube.com/channel/abc')
+
+
+def test_vtt_is_deduplicated_and_chunked_by_time():
+    cues = parse_vtt(VTT)
+    assert [text for _, text in cues] == ['안녕하세요 여러분', '오늘은 파이썬을 배웁니다', '제너레이터를 알아봅시다']
+    text = chunk_cues(cues, chunk_seconds=60)
+    assert text == '[00:00] 안녕하세요 여러분 오늘은 파이썬을 배웁니다\n\n[01:05] 제너레이터를 알아봅시다'
+
+
+def test_manual_subtitles_preferred_over_automatic():
+    info = {
+        'subtitles': {'en': [{'ext': 'vtt', 'url': 'manual-en'}]},
+        'automatic_captions': {'ko': [{'ext': 'json3', 'url': 'auto-ko'}, {'ext': 'vtt', 'url': 'auto-ko-vtt'}]},
+    }
+    assert _pick_track(info, ['ko', 'en']) == ('en', 'vtt', 'manual-en')
+    assert _pick_track({'automatic_captions': info['automatic_captions']}, ['ko']) == ('ko', 'json3', 'auto-ko')